@@ -0,0 +1 @@
+"""Benchmarks for cert-hero - see `benchmarks/run.py`."""
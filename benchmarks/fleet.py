@@ -0,0 +1,205 @@
+"""A fleet of local TLS servers, with generated certs, for benchmarks."""
+from __future__ import annotations
+
+import multiprocessing
+import socket
+import ssl
+import subprocess
+import threading
+import time
+
+from dataclasses import dataclass
+from itertools import cycle, product
+from pathlib import Path
+
+
+HTTP_RESPONSE_HEAD = (
+    b'HTTP/1.1 301 Moved Permanently\r\n'
+    b'Location: https://cert-hero.test/\r\n'
+    b'Content-Length: 1048576\r\n'
+    b'\r\n'
+)
+
+# Kinds of servers in the fleet:
+#   normal    - completes the handshake, and responds right away
+#   slow      - waits `latency` seconds before the handshake (e.g. a far-away host)
+#   slowloris - responds with the head right away, then trickles the body one byte at a time
+#   dead      - a closed port, so the connection is refused
+KINDS = ('normal', 'slow', 'slowloris', 'dead')
+
+
+@dataclass
+class Server:
+    """A server in the fleet."""
+    kind: str
+    key_type: str
+    num_sans: int
+    port: int = 0
+
+    @property
+    def target(self) -> str:
+        return f'127.0.0.1:{self.port}'
+
+
+def generate_cert(directory: Path, key_type: str, num_sans: int) -> tuple[Path, Path]:
+    """
+    Generate a self-signed cert with a ``key_type`` key - e.g. ``rsa:2048`` or
+    ``ec:prime256v1`` - and ``num_sans`` Subject Alt Names, with the ``openssl`` CLI.
+
+    :return: the paths to the cert and key (PEM) files
+    """
+    name = f'{key_type.replace(":", "-")}-{num_sans}'
+    cert_file, key_file = directory / f'{name}.cert.pem', directory / f'{name}.key.pem'
+
+    if key_type.startswith('ec:'):
+        newkey = ['-newkey', 'ec', '-pkeyopt', f'ec_paramgen_curve:{key_type[3:]}']
+    else:
+        newkey = ['-newkey', key_type]
+
+    sans = ','.join(f'DNS:host-{i}.cert-hero.test' for i in range(num_sans))
+
+    subprocess.run(
+        ['openssl', 'req', '-x509', *newkey, '-nodes', '-days', '30',
+         '-keyout', str(key_file), '-out', str(cert_file),
+         '-subj', f'/CN={name}.cert-hero.test', '-addext', f'subjectAltName={sans}'],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    return cert_file, key_file
+
+
+def plan_fleet(num_servers: int,
+               mix: dict[str, float],
+               key_types: list[str],
+               san_counts: list[int]) -> list[Server]:
+    """
+    Plan a fleet of ``num_servers`` servers, with each kind of server in proportion
+    to its weight in ``mix``, and the (live) servers cycling through each
+    combination of ``key_types`` and ``san_counts``.
+    """
+    total = sum(mix.values())
+    kinds = []
+    for kind, weight in mix.items():
+        kinds += [kind] * round(num_servers * weight / total)
+    # make up for any rounding
+    kinds = (kinds + ['normal'] * num_servers)[:num_servers]
+
+    certs = cycle(product(key_types, san_counts))
+    return [Server(kind, *next(certs)) for kind in kinds]
+
+
+class Fleet:
+    """
+    Run a fleet of local TLS servers - planned with :func:`plan_fleet` - in a
+    separate process, so that they don't add to the CPU or memory usage of
+    the process being benchmarked::
+
+        >>> with Fleet(servers, cert_dir, latency=0.05) as fleet:
+        ...     targets = [server.target for server in fleet.servers]
+
+    """
+
+    def __init__(self, servers: list[Server], cert_dir: Path, latency: float = 0.05, backlog: int = 1024):
+        self.servers = servers
+        self.cert_dir = cert_dir
+        self.latency = latency
+        self.backlog = backlog
+        self._process = None
+        self._stop = None
+
+    def __enter__(self) -> Fleet:
+        certs = {}
+        for server in self.servers:
+            if server.kind != 'dead' and (cert := (server.key_type, server.num_sans)) not in certs:
+                certs[cert] = generate_cert(self.cert_dir, *cert)
+
+        for server in self.servers:
+            if server.kind == 'dead':
+                server.port = _closed_port()
+
+        ctx = multiprocessing.get_context('spawn')
+        parent_conn, child_conn = ctx.Pipe()
+        self._stop = ctx.Event()
+        self._process = ctx.Process(
+            target=_serve_fleet,
+            args=(self.servers, certs, self.latency, self.backlog, child_conn, self._stop),
+            daemon=True,
+        )
+        self._process.start()
+
+        ports = parent_conn.recv()
+        for server, port in zip(self.servers, ports):
+            if port:
+                server.port = port
+
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._process.join(5)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+def _closed_port() -> int:
+    """Return a local port which nothing is listening on."""
+    with socket.create_server(('127.0.0.1', 0)) as sock:
+        return sock.getsockname()[1]
+
+
+def _serve_fleet(servers, certs, latency, backlog, conn, stop):
+    """Start each (live) server in ``servers``, send their ports over ``conn``, and serve until ``stop``."""
+    socks = []
+    ports = []
+
+    for server in servers:
+        if server.kind == 'dead':
+            ports.append(0)
+            continue
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*certs[server.key_type, server.num_sans])
+
+        sock = socket.create_server(('127.0.0.1', 0), backlog=backlog)
+        socks.append(sock)
+        ports.append(sock.getsockname()[1])
+
+        threading.Thread(target=_accept, args=(sock, context, server.kind, latency), daemon=True).start()
+
+    conn.send(ports)
+    stop.wait()
+
+    for sock in socks:
+        sock.close()
+
+
+def _accept(sock, context, kind, latency):
+    while True:
+        try:
+            client, _ = sock.accept()
+        except OSError:  # closed
+            return
+        threading.Thread(target=_handle, args=(client, context, kind, latency), daemon=True).start()
+
+
+def _handle(client, context, kind, latency):
+    try:
+        if kind == 'slow':
+            time.sleep(latency)
+
+        with context.wrap_socket(client, server_side=True) as tls_conn:
+            data = b''
+            while b'\r\n\r\n' not in data:
+                if not (chunk := tls_conn.recv(1024)):
+                    return
+                data += chunk
+
+            tls_conn.sendall(HTTP_RESPONSE_HEAD)
+
+            if kind == 'slowloris':
+                # until the client gives up on the body
+                while True:
+                    tls_conn.sendall(b'.')
+                    time.sleep(0.1)
+    except OSError:
+        pass
@@ -0,0 +1,95 @@
+"""
+Benchmark the startup time of ``import cert_hero``, and of the ``ch`` CLI.
+
+Usage::
+
+    $ python -m benchmarks.import_time --runs 20 --output import_time.json
+
+Each statement runs in a fresh interpreter, ``--runs`` times; the time to start up
+a bare interpreter is measured the same way, and reported alongside. The modules
+which take the longest to import (per ``python -X importtime``) are also reported.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+from statistics import median
+
+from .run import _metadata
+
+
+# Name -> statement to time, in a fresh interpreter
+STATEMENTS = {
+    'python': 'pass',
+    'import cert_hero': 'import cert_hero',
+    'ch --help': 'import sys; sys.argv = ["ch", "--help"]; from cert_hero.cli import main; main()',
+}
+
+
+def time_statement(statement: str, runs: int) -> list[float]:
+    """Return the wall time (in seconds) of each of ``runs`` fresh interpreters running ``statement``."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=False, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def slowest_imports(statement: str, top: int) -> list[dict]:
+    """Return the ``top`` modules with the longest (cumulative) import time, for ``statement``."""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        check=False, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    ).stderr
+
+    modules = []
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append({'module': name.strip(), 'self_ms': int(self_us) / 1000,
+                        'cumulative_ms': int(cumulative_us) / 1000})
+
+    return sorted(modules, key=lambda m: m['cumulative_ms'], reverse=True)[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.import_time', description=__doc__.split('\n\n')[1])
+    parser.add_argument('--runs', type=int, default=10, help='number of runs of each statement (default: 10)')
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of the slowest imports to report (default: %(default)s)')
+    parser.add_argument('--output', '-o', help='file to write the results (JSON) to (default: stdout)')
+    args = parser.parse_args(argv)
+
+    results = {'metadata': _metadata(), 'config': {'runs': args.runs}, 'runs': []}
+
+    for name, statement in STATEMENTS.items():
+        times = time_statement(statement, args.runs)
+        results['runs'].append({
+            'name': name,
+            'median_ms': median(times) * 1000,
+            'min_ms': min(times) * 1000,
+            'max_ms': max(times) * 1000,
+            'slowest_imports': slowest_imports(statement, args.top) if name != 'python' else [],
+        })
+        print(f'{name:>18}: median {median(times) * 1000:6.1f} ms, min {min(times) * 1000:6.1f} ms',
+              file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Benchmark the sweep engines - :func:`iter_certs_please` (threads) and
+:func:`async_iter_certs_please` (asyncio) - against a fleet of local TLS servers.
+
+Usage::
+
+    $ python -m benchmarks.run --servers 50 --hosts 2000 --output results.json
+
+Each engine runs in a fresh process, so that its peak RSS isn't skewed by an earlier
+run. The results are written as JSON, along with enough metadata (version, commit,
+Python, platform) to track them over time.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import cycle, islice
+from pathlib import Path
+from statistics import quantiles
+
+from .fleet import KINDS, Fleet, plan_fleet
+
+
+def _run_threads(targets, options):
+    from cert_hero import SweepStats, iter_certs_please
+
+    stats = SweepStats()
+    results = list(iter_certs_please(
+        targets, num_threads=options['concurrency'], cert_only=options['cert_only'],
+        timeout=options['timeout'], stats=stats,
+    ))
+    return results, stats
+
+
+def _run_asyncio(targets, options):
+    from cert_hero import SweepStats, async_iter_certs_please
+
+    stats = SweepStats()
+
+    async def sweep():
+        return [result async for result in async_iter_certs_please(
+            targets, concurrency=options['concurrency'], cert_only=options['cert_only'],
+            timeout=options['timeout'], stats=stats,
+        )]
+
+    return asyncio.run(sweep()), stats
+
+
+# Engine name -> function which runs a sweep of `targets`, and returns the
+# `(target, cert)` results and the `SweepStats`. Add any new engines here.
+ENGINES = {
+    'threads': _run_threads,
+    'asyncio': _run_asyncio,
+}
+
+
+def measure(engine: str, targets: list[str], options: dict) -> dict:
+    """Run a sweep of ``targets`` with ``engine``, and measure it (in this process)."""
+    # import up front, so that the import isn't counted in the sweep
+    import cert_hero  # noqa: F401
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    results, stats = ENGINES[engine](targets, options)
+    seconds = time.perf_counter() - start
+    cpu_seconds = time.process_time() - cpu_start
+
+    num_hosts = len(results)
+    latencies = sorted(cert.elapsed for _, cert in results if cert.elapsed is not None)
+    p50, p99 = _quantiles(latencies)
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # in bytes on macOS, and KiB everywhere else
+    peak_rss_kib = peak_rss // 1024 if sys.platform == 'darwin' else peak_rss
+
+    return {
+        'engine': engine,
+        'hosts': num_hosts,
+        'seconds': seconds,
+        'hosts_per_sec': num_hosts / seconds if seconds else None,
+        'latency_p50': p50,
+        'latency_p99': p99,
+        'peak_rss_kib': peak_rss_kib,
+        'cpu_seconds': cpu_seconds,
+        'cpu_ms_per_host': 1000 * cpu_seconds / num_hosts if num_hosts else None,
+        'statuses': dict(Counter(cert['Cert Status'] for _, cert in results)),
+        'phases': stats.summary(),
+    }
+
+
+def _quantiles(values: list[float]) -> tuple[float | None, float | None]:
+    """Return the p50 and p99 of ``values``."""
+    if not values:
+        return None, None
+    if len(values) == 1:
+        return values[0], values[0]
+    percentiles = quantiles(values, n=100, method='inclusive')
+    return percentiles[49], percentiles[98]
+
+
+def _metadata() -> dict:
+    from cert_hero.__version__ import __version__
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'version': __version__,
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': multiprocessing.cpu_count(),
+    }
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(','):
+        kind, _, weight = part.partition('=')
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f'unknown kind of server: {kind!r} (expected one of {KINDS})')
+        mix[kind] = float(weight)
+    return mix
+
+
+def _parse_list(value: str) -> list[str]:
+    return [v for v in value.split(',') if v]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--engines', type=_parse_list, default=list(ENGINES),
+                        help=f'comma-separated engines to benchmark (default: {",".join(ENGINES)})')
+    parser.add_argument('--servers', type=int, default=20, help='number of servers in the fleet (default: 20)')
+    parser.add_argument('--hosts', type=int, default=1000,
+                        help='number of hosts to sweep - cycling through the fleet (default: 1000)')
+    parser.add_argument('--mix', type=_parse_mix, default='normal=0.7,slow=0.1,slowloris=0.1,dead=0.1',
+                        help='weight of each kind of server in the fleet (default: %(default)s)')
+    parser.add_argument('--key-types', type=_parse_list, default='rsa:2048,rsa:4096,ec:prime256v1',
+                        help='comma-separated key types of the certs (default: %(default)s)')
+    parser.add_argument('--san-counts', type=lambda v: [int(n) for n in _parse_list(v)], default='1,10,100',
+                        help='comma-separated number of SANs in the certs (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='seconds a slow server waits before the handshake (default: %(default)s)')
+    parser.add_argument('--concurrency', type=int, default=50,
+                        help='max number of hosts in flight, for each engine (default: %(default)s)')
+    parser.add_argument('--timeout', type=float, default=3, help='timeout for each host (default: %(default)s)')
+    parser.add_argument('--cert-only', action='store_true', help='skip the HTTP call after the handshake')
+    parser.add_argument('--repeat', type=int, default=1, help='number of runs of each engine (default: 1)')
+    parser.add_argument('--output', '-o', help='file to write the results (JSON) to (default: stdout)')
+    args = parser.parse_args(argv)
+
+    if unknown := set(args.engines) - ENGINES.keys():
+        parser.error(f'unknown engine(s): {", ".join(sorted(unknown))}')
+
+    servers = plan_fleet(args.servers, args.mix, args.key_types, args.san_counts)
+    options = {'concurrency': args.concurrency, 'timeout': args.timeout, 'cert_only': args.cert_only}
+    runs = []
+
+    with tempfile.TemporaryDirectory() as cert_dir, Fleet(servers, Path(cert_dir), args.latency) as fleet:
+        targets = list(islice(cycle(server.target for server in fleet.servers), args.hosts))
+
+        for engine in args.engines:
+            for _ in range(args.repeat):
+                with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                    run = pool.submit(measure, engine, targets, options).result()
+                runs.append(run)
+                print(f'{engine:>10}: {run["hosts_per_sec"]:8.1f} hosts/s, '
+                      f'p50 {run["latency_p50"] * 1000:7.1f} ms, p99 {run["latency_p99"] * 1000:7.1f} ms, '
+                      f'{run["cpu_ms_per_host"]:6.2f} CPU ms/host, peak RSS {run["peak_rss_kib"] / 1024:.1f} MiB',
+                      file=sys.stderr)
+
+    results = {
+        'metadata': _metadata(),
+        'config': {
+            **options,
+            'servers': args.servers,
+            'hosts': args.hosts,
+            'mix': args.mix,
+            'key_types': args.key_types,
+            'san_counts': args.san_counts,
+            'latency': args.latency,
+        },
+        'runs': runs,
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
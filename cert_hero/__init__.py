@@ -60,8 +60,31 @@ __all__ = [
     # Core exports
     'cert_please',
     'certs_please',
+    'iter_certs_please',
+    # Asyncio exports
+    'async_cert_please',
+    'async_certs_please',
+    'async_iter_certs_please',
+    # Offline parsing
+    'cert_from_der',
+    'cert_from_pem',
+    'certs_from_paths',
+    # Sharded sweeps
+    'sharded_certs_please',
+    'merge_shards',
+    'shard_of',
+    'in_shard',
     # Models
     'CertHero',
+    'LazyCertHero',
+    'CertRecord',
+    'CertCache',
+    'SweepJournal',
+    'Resolver',
+    'RetryPolicy',
+    'AdaptiveConcurrency',
+    'RateLimit',
+    'SweepStats',
     # Utilities
     'create_ssl_context',
     'set_expired',
@@ -71,11 +94,50 @@ import logging
 
 from .cert_hero import (
     CertHero,
+    LazyCertHero,
+    cert_from_der,
+    cert_from_pem,
     cert_please,
+    certs_from_paths,
     certs_please,
     create_ssl_context,
+    iter_certs_please,
     set_expired,
 )
+from .resolver import Resolver
+from .stats import SweepStats
+
+# Exports which are imported on first access, so that `import cert_hero` stays fast -
+# e.g. `asyncio`, `sqlite3` and `multiprocessing` are only imported if they're needed.
+_LAZY_EXPORTS = {
+    'async_cert_please': 'aio',
+    'async_certs_please': 'aio',
+    'async_iter_certs_please': 'aio',
+    'CertCache': 'cache',
+    'SweepJournal': 'journal',
+    'sharded_certs_please': 'shard',
+    'merge_shards': 'shard',
+    'shard_of': 'shard',
+    'in_shard': 'shard',
+    'CertRecord': 'record',
+    'RetryPolicy': 'policies',
+    'AdaptiveConcurrency': 'policies',
+    'RateLimit': 'policies',
+}
+
+
+def __getattr__(name):
+    if (module := _LAZY_EXPORTS.get(name)) is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    from importlib import import_module
+
+    value = globals()[name] = getattr(import_module(f'.{module}', __name__), name)
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 # Set up logging to ``/dev/null`` like a library is supposed to.
 # http://docs.python.org/3.3/howto/logging.html#configuring-logging-for-a-library
@@ -0,0 +1,591 @@
+"""Asyncio versions of the core functions."""
+from __future__ import annotations
+
+import asyncio
+import ssl
+import socket
+
+from concurrent.futures import Executor
+from hashlib import sha256
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Iterable
+
+from .cert_hero import (
+    LOG,
+    _CERT_PARSE_ERRORS,
+    _DEFAULT_USER_AGENT,
+    _END_OF_HEAD,
+    _HAPPY_EYEBALLS_DELAY,
+    _MAX_HEAD_SIZE,
+    _PARSED_CERTS,
+    CertHero,
+    _Sweep,
+    _build_cert,
+    _build_failed_cert,
+    _build_throttled_cert,
+    _expand_targets,
+    _failure_status,
+    _http_request,
+    _interleave_addr_infos,
+    _parse_cert_remote,
+    _parse_http_response,
+    _parse_target,
+    _set_timings,
+    create_ssl_context,
+    get_user_agent,
+)
+from .resolver import Resolver
+from .stats import _Stopwatch
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .cache import CertCache
+    from .journal import SweepJournal
+    from .policies import AdaptiveConcurrency, RateLimit, RetryPolicy
+    from .stats import SweepStats
+
+
+# `asyncio` takes an `ssl_handshake_timeout` of `None` to mean its default (60 seconds),
+# so no timeout for the TLS handshake is passed in as a (very) long one instead
+_NO_HANDSHAKE_TIMEOUT = 365 * 24 * 60 * 60.0
+
+
+async def async_cert_please(hostname: str | tuple[str, int],
+                            context: ssl.SSLContext = None,
+                            user_agent: str | None = _DEFAULT_USER_AGENT,
+                            default_encoding='latin-1',
+                            cert_only: bool = False,
+                            timeout: float | None = 3,
+                            connect_timeout: float | None = None,
+                            handshake_timeout: float | None = None,
+                            read_timeout: float | None = None,
+                            port: int | None = None,
+                            happy_eyeballs_delay: float = _HAPPY_EYEBALLS_DELAY,
+                            resolver: Resolver | None = None,
+                            lazy: bool = False,
+                            decode_pool: Executor | None = None,
+                            timings: bool = False,
+                            ) -> CertHero[str, str | int | dict[str, str | bool]] | None:
+    """
+    Retrieve (asynchronously) the SSL certificate for a given ``hostname`` - works even
+    in the case of expired or self-signed certificates.
+
+    This is the coroutine version of :func:`cert_please`, built on top of
+    :func:`asyncio.open_connection`, and it returns the same :class:`CertHero` object.
+
+    Usage:
+
+    >>> import asyncio, cert_hero
+    >>> cert = asyncio.run(cert_hero.async_cert_please('google.com'))
+    >>> cert.not_after_date
+    datetime.date(2023, 10, 28)
+
+    :param hostname: Host (or server) to retrieve SSL Certificate for. This can optionally
+      include a port - e.g. ``host:8443`` or ``[v6]:8443`` - or be a ``(host, port)`` tuple.
+    :param context: (Optional) Shared SSL Context
+    :param user_agent: A custom *user agent* to use for the HTTP call to retrieve ``Location`` and ``Status``.
+      Defaults to ``python-requests/{version}``, or a random *user agent* if the ``fake_useragent`` module
+      is installed (via the ``fake-ua``
+      `extra <https://packaging.python.org/en/latest/tutorials/installing-packages/#installing-extras>`__).
+    :param default_encoding: Encoding used to decode bytes for the HTTP call to retrieve ``Location``
+      and ``Status``. Defaults to ``latin-1`` (or ISO-8859-1).
+    :param cert_only: If true, close the connection right after the TLS handshake, and skip the HTTP
+      call to retrieve ``Location`` and ``Status``.
+    :param timeout: Default timeout (in seconds) for each step below, if not otherwise specified,
+      or ``None`` for no timeout.
+    :param connect_timeout: Timeout (in seconds) to establish the TCP connection.
+    :param handshake_timeout: Timeout (in seconds) for the TLS handshake.
+    :param read_timeout: Timeout (in seconds) for the HTTP call to retrieve ``Location`` and ``Status``.
+    :param port: Port to connect to. Defaults to the port in ``hostname``, if any, else ``443``.
+    :param happy_eyeballs_delay: If ``hostname`` resolves to several (IPv4 or IPv6) addresses, connections
+      to each are raced, staggered by this many seconds; the first successful connection wins.
+    :param resolver: (Optional) Shared :class:`Resolver`, to cache DNS lookups (or to use
+      pre-resolved addresses) across calls.
+    :param lazy: If true, return a :class:`LazyCertHero`, which only decodes each field of the
+      cert when it's accessed (or serialized).
+    :param decode_pool: (Optional) Executor - usually a :class:`ProcessPoolExecutor` - to decode
+      the cert in, so that parsing doesn't block the event loop.
+    :param timings: If true, record the time spent in each phase (see :attr:`CertHero.timings`),
+      along with the negotiated TLS version and cipher, on the result.
+    :return: The SSL Certificate (e.g. :class:`CertHero`) for the host, or ``None`` if it could not be
+      retrieved. Sweeps such as :func:`async_certs_please` instead report why, in the ``Cert Status``.
+
+    """
+    cert_info = await _async_cert_please(
+        hostname, context, user_agent, default_encoding, cert_only, timeout, connect_timeout,
+        handshake_timeout, read_timeout, port, happy_eyeballs_delay, resolver, lazy, decode_pool, timings,
+    )
+
+    return cert_info if cert_info['Cert Status'] == 'SUCCESS' else None
+
+
+async def _async_cert_please(hostname: str | tuple[str, int],
+                             context: ssl.SSLContext = None,
+                             user_agent: str | None = _DEFAULT_USER_AGENT,
+                             default_encoding='latin-1',
+                             cert_only: bool = False,
+                             timeout: float | None = 3,
+                             connect_timeout: float | None = None,
+                             handshake_timeout: float | None = None,
+                             read_timeout: float | None = None,
+                             port: int | None = None,
+                             happy_eyeballs_delay: float = _HAPPY_EYEBALLS_DELAY,
+                             resolver: Resolver | None = None,
+                             lazy: bool = False,
+                             decode_pool: Executor | None = None,
+                             timings: bool = False,
+                             rate_limit: RateLimit | None = None,
+                             ) -> CertHero[str, str | int | dict[str, str | bool]]:
+    """
+    Retrieve (asynchronously) the SSL certificate for a given ``hostname``, as with
+    :func:`async_cert_please`.
+
+    If it could not be retrieved, return a failed :class:`CertHero` instead of ``None``,
+    with the reason in ``Cert Status``, and the time it took in :attr:`CertHero.elapsed`.
+
+    If a ``rate_limit`` is passed in, and the destination of ``hostname`` is at its cap,
+    return right away with a ``Cert Status`` of ``THROTTLED``.
+    """
+    if context is None:
+        context = create_ssl_context()
+
+    stopwatch = _Stopwatch()
+
+    try:
+        hostname, port = _parse_target(hostname, port)
+    except ValueError as e:
+        LOG.error(f'{e.__class__.__name__}: {e}. {hostname=} {port=}')
+        cert_info = _build_failed_cert('INVALID_TARGET')
+        cert_info._elapsed = stopwatch.elapsed()
+        return cert_info
+
+    if connect_timeout is None:
+        connect_timeout = timeout
+    if handshake_timeout is None:
+        handshake_timeout = _NO_HANDSHAKE_TIMEOUT if timeout is None else timeout
+    if read_timeout is None:
+        read_timeout = timeout
+
+    status_code = loc = None
+    slot_ip = None
+
+    try:
+        if resolver is None:
+            addr_infos = await asyncio.get_running_loop().getaddrinfo(
+                hostname, port, type=socket.SOCK_STREAM)
+        else:
+            addr_infos = await resolver.async_resolve(hostname, port)
+
+        stopwatch.lap('dns')
+
+        # hold a slot for the destination, if it's rate limited
+        if rate_limit is not None:
+            ip = addr_infos[0][4][0]
+            if (destination := rate_limit.acquire(ip)) is not None:
+                return _build_throttled_cert(destination)
+            slot_ip = ip
+
+        sock = await asyncio.wait_for(
+            _connect_happy_eyeballs(addr_infos, happy_eyeballs_delay),
+            connect_timeout,
+        )
+
+        stopwatch.lap('connect')
+
+        # upgrade the connection to SSL (this performs the TLS handshake)
+        try:
+            reader, writer = await asyncio.open_connection(
+                sock=sock,
+                ssl=context,
+                server_hostname=hostname,
+                ssl_handshake_timeout=handshake_timeout,
+                limit=_MAX_HEAD_SIZE,
+            )
+        except ConnectionAbortedError as e:
+            # this is how `asyncio` reports that `ssl_handshake_timeout` expired
+            sock.close()
+            raise asyncio.TimeoutError from e
+        except BaseException:
+            sock.close()
+            raise
+
+        stopwatch.lap('handshake')
+
+        try:
+            # get certificate
+            ssl_object: ssl.SSLObject = writer.get_extra_info('ssl_object')
+            cert_bin: bytes = ssl_object.getpeercert(True)
+            tls_version, cipher = ssl_object.version(), ssl_object.cipher()
+
+            if not cert_only:
+                # use custom `user_agent` if passed in, else:
+                #   * use a random "user agent", if the `fake_useragent` module is installed,
+                #     else use the default "user agent" (python-requests)
+                if not user_agent:
+                    user_agent = get_user_agent()
+
+                LOG.debug('User Agent: %s', user_agent)
+
+                writer.write(_http_request(hostname, user_agent, port))  # send request
+                await writer.drain()
+
+                # only read up to the end of the headers; the body is not needed
+                data = await asyncio.wait_for(_read_http_head(reader), read_timeout)
+                status_code, loc = _parse_http_response(data, default_encoding)
+                stopwatch.lap('http')
+        finally:
+            # close right away, without waiting on a (graceful) TLS shutdown
+            writer.transport.abort()
+
+    except asyncio.TimeoutError:
+        LOG.error(f'TimeoutError: timed out. {hostname=} {port=}')
+        cert_info = _build_failed_cert('TIMED_OUT')
+    except Exception as e:
+        status = _failure_status(e)
+        LOG.error(f'{e.__class__.__name__}: {e}. {hostname=} {port=} {status=}')
+        cert_info = _build_failed_cert(status)
+    else:
+        try:
+            if decode_pool is not None and not lazy:
+                fingerprint = sha256(cert_bin).hexdigest().upper()
+                if _PARSED_CERTS.get(fingerprint) is None:
+                    parsed = await asyncio.get_running_loop().run_in_executor(
+                        decode_pool, _parse_cert_remote, cert_bin)
+                    parsed._der = cert_bin
+                    _PARSED_CERTS[fingerprint] = parsed
+
+            cert_info = _build_cert(cert_bin, loc, status_code, lazy)
+        except _CERT_PARSE_ERRORS as e:
+            LOG.error(f'{e.__class__.__name__}: invalid cert - {e}. {hostname=} {port=}')
+            cert_info = _build_failed_cert('INVALID_CERT')
+        else:
+            stopwatch.lap('parse')
+            if timings:
+                _set_timings(cert_info, stopwatch.stop(), tls_version, cipher)
+    finally:
+        if slot_ip is not None:
+            rate_limit.release(slot_ip)
+
+    cert_info._elapsed = stopwatch.elapsed()
+
+    return cert_info
+
+
+async def async_certs_please(
+    hostnames: Iterable[str | tuple[str, int]] | AsyncIterable[str | tuple[str, int]],
+    context: ssl.SSLContext = None,
+    concurrency: int = 1000,
+    user_agent: str | None = _DEFAULT_USER_AGENT,
+    cert_only: bool = False,
+    deadline: float | None = None,
+    ports: Iterable[int] | None = None,
+    resolver: Resolver | None = None,
+    cache: CertCache | None = None,
+    **kwargs,
+) -> dict[str | tuple[str, int], CertHero]:
+    """
+    Retrieve (asynchronously) the SSL certificate(s) for a list of ``hostnames`` - works
+    even in the case of expired or self-signed certificates.
+
+    This is the coroutine version of :func:`certs_please`; concurrency is bounded by
+    a window of in-flight tasks rather than a thread pool, so ``concurrency`` can safely
+    go into the thousands.
+
+    Usage:
+
+    >>> import asyncio, cert_hero
+    >>> host_to_cert = asyncio.run(cert_hero.async_certs_please(['google.com', 'cnn.com']))
+
+    :param hostnames: List (or any iterable, or async iterable) of hosts to retrieve SSL Certificate(s) for
+    :param context: (Optional) Shared SSL Context
+    :param concurrency: Max number of concurrent connections
+    :param user_agent: A custom *user agent* to use for the HTTP call to retrieve ``Location`` and ``Status``.
+    :param cert_only: If true, skip the HTTP call to retrieve ``Location`` and ``Status``.
+    :param deadline: Max number of seconds for the entire sweep. Any hosts which are still outstanding
+      at that point are cancelled, and reported with a ``Cert Status`` of ``DEADLINE_EXCEEDED``.
+    :param ports: (Optional) Ports to scan for each host in ``hostnames`` which doesn't specify a port
+      of its own. When passed in, each result is keyed by a ``(host, port)`` tuple.
+    :param resolver: (Optional) Shared :class:`Resolver`, to cache DNS lookups (or to use pre-resolved
+      addresses). Defaults to a new :class:`Resolver` for this sweep.
+    :param cache: (Optional) Persistent :class:`CertCache`. Hosts with a fresh entry in the cache are
+      answered from it, without a network round trip, and new results are saved to it.
+    :param kwargs: Any additional keyword arguments - such as timeouts - to pass to :func:`async_cert_please`,
+      or ``decode_processes``, ``retry``, ``adaptive``, ``rate_limit``, ``journal`` and ``stats`` (see :func:`async_iter_certs_please`).
+    :return: A mapping of ``hostname`` to the SSL Certificate (e.g. :class:`CertHero`) for that host
+
+    """
+    _host_to_cert = {}
+
+    async def _track_order(_hostnames):
+        # Reserve a slot for each host as it's submitted, so that the
+        # result is in the same order as `hostnames`.
+        async for host in _hostnames:
+            _host_to_cert[host] = None
+            yield host
+
+    async for host, cert_info in async_iter_certs_please(
+        _track_order(_aiter(hostnames, ports)), context, concurrency, user_agent,
+        cert_only=cert_only, deadline=deadline, resolver=resolver, cache=cache, **kwargs,
+    ):
+        _host_to_cert[host] = cert_info
+
+    return _host_to_cert
+
+
+async def async_iter_certs_please(
+    hostnames: Iterable[str | tuple[str, int]] | AsyncIterable[str | tuple[str, int]],
+    context: ssl.SSLContext = None,
+    concurrency: int = 1000,
+    user_agent: str | None = _DEFAULT_USER_AGENT,
+    cert_only: bool = False,
+    deadline: float | None = None,
+    ports: Iterable[int] | None = None,
+    resolver: Resolver | None = None,
+    cache: CertCache | None = None,
+    decode_processes: int | None = None,
+    retry: RetryPolicy | None = None,
+    adaptive: AdaptiveConcurrency | None = None,
+    rate_limit: RateLimit | None = None,
+    journal: SweepJournal | None = None,
+    stats: SweepStats | None = None,
+    **kwargs,
+) -> AsyncIterator[tuple[str | tuple[str, int], CertHero]]:
+    """
+    Retrieve (asynchronously) the SSL certificate(s) for a list of ``hostnames``, and
+    yield each ``(hostname, cert)`` pair as soon as that host completes.
+
+    This is the coroutine version of :func:`iter_certs_please`. ``hostnames`` is
+    consumed lazily, and at most ``concurrency`` hosts are in flight at any time,
+    so memory usage stays constant no matter how many hosts are scanned.
+
+    Usage:
+
+    >>> async for host, cert in cert_hero.async_iter_certs_please(['google.com', 'cnn.com']):
+    ...     print(host, cert['Cert Status'])
+
+    :param hostnames: List (or any iterable, or async iterable) of hosts to retrieve SSL Certificate(s) for
+    :param context: (Optional) Shared SSL Context
+    :param concurrency: Max number of concurrent connections
+    :param user_agent: A custom *user agent* to use for the HTTP call to retrieve ``Location`` and ``Status``.
+    :param cert_only: If true, skip the HTTP call to retrieve ``Location`` and ``Status``.
+    :param deadline: Max number of seconds for the entire sweep. Any hosts which are still outstanding
+      at that point - including those not yet consumed from ``hostnames`` - are cancelled and yielded
+      right away, with a ``Cert Status`` of ``DEADLINE_EXCEEDED``.
+    :param ports: (Optional) Ports to scan for each host in ``hostnames`` which doesn't specify a port
+      of its own. When passed in, each result is keyed by a ``(host, port)`` tuple.
+    :param resolver: (Optional) Shared :class:`Resolver`, to cache DNS lookups (or to use pre-resolved
+      addresses). Defaults to a new :class:`Resolver` for this sweep.
+    :param cache: (Optional) Persistent :class:`CertCache`. Hosts with a fresh entry in the cache are
+      answered from it, without a network round trip, and new results are saved to it.
+    :param decode_processes: (Optional) Number of processes to decode certs in. When passed in, each
+      cert is parsed in a :class:`ProcessPoolExecutor`, rather than on the event loop.
+    :param retry: (Optional) :class:`RetryPolicy` for hosts which fail with a transient error, such as
+      ``TIMED_OUT``. Retries are scheduled (after a backoff) in between other hosts, and only the final
+      result for each host is yielded.
+    :param adaptive: (Optional) :class:`AdaptiveConcurrency`, to adjust the number of hosts in flight
+      to the capacity of the network - growing it while hosts complete normally, and backing off on
+      timeouts or resets. When passed in, it takes the place of ``concurrency``.
+    :param rate_limit: (Optional) :class:`RateLimit` on the number of new connections per second, and
+      on concurrent connections to each IP address or subnet. A host whose destination is at its cap
+      is set aside - without holding up hosts for other destinations - until that destination frees up.
+    :param journal: (Optional) :class:`SweepJournal` to record each result to, as soon as it completes.
+      Hosts already recorded in it - e.g. by an earlier run which didn't finish - are answered from it,
+      without a network round trip, so that the sweep can be resumed.
+    :param stats: (Optional) :class:`SweepStats` to add each result to. This also records the
+      :attr:`CertHero.timings` of each host, so that aggregate percentiles of each phase are available.
+    :param kwargs: Any additional keyword arguments - such as timeouts - to pass to :func:`async_cert_please`.
+    :return: An async iterator of ``(hostname, cert)`` pairs, in the order that each host completes
+
+    """
+    if stats is not None:
+        # the stats need the timings of each host (even if `timings=False` is passed in)
+        kwargs['timings'] = True
+        async for host, cert_info in async_iter_certs_please(
+            hostnames, context, concurrency, user_agent, cert_only, deadline, ports,
+            resolver, cache, decode_processes, retry, adaptive, rate_limit, journal, **kwargs,
+        ):
+            stats.add(cert_info)
+            yield host, cert_info
+        return
+
+    if context is None:
+        context = create_ssl_context()
+
+    if resolver is None:
+        resolver = Resolver()
+
+    hostnames = _aiter(hostnames, ports)
+    exhausted = False
+    deadline_exceeded = False
+
+    sweep = _Sweep(concurrency, asyncio.get_running_loop().time, deadline, retry, adaptive, rate_limit,
+                   journal, cache)
+
+    decode_pool = None
+    if decode_processes:
+        from concurrent.futures import ProcessPoolExecutor
+        decode_pool = kwargs['decode_pool'] = ProcessPoolExecutor(max_workers=decode_processes)
+
+    def submit(_host, _attempt):
+        _task = asyncio.ensure_future(
+            _async_cert_please(
+                _host, context, user_agent, cert_only=cert_only, resolver=resolver,
+                rate_limit=rate_limit, **kwargs,
+            )
+        )
+        sweep.add(_task, _host, _attempt)
+
+    try:
+        while True:
+            # Top up the window of in-flight hosts: first with any retries which are due,
+            # or hosts whose destination is no longer at its cap, and then with new hosts
+            for host, attempt in sweep.due():
+                submit(host, attempt)
+
+            while not exhausted and sweep.can_read():
+                try:
+                    host = await hostnames.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+
+                # answer from the journal or the cache, if possible
+                if (cert_info := sweep.lookup(host)) is not None:
+                    yield host, cert_info
+                else:
+                    submit(host, 1)
+
+            if exhausted and sweep.idle():
+                break
+
+            timeout = sweep.timeout()
+            if sweep.pending:
+                done, _ = await asyncio.wait(sweep.pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(timeout)
+                done = ()
+
+            for task in done:
+                host, cert_info = sweep.complete(task)
+                if cert_info is not None:
+                    yield host, cert_info
+
+            if sweep.past_deadline():
+                deadline_exceeded = True
+                break
+
+        if deadline_exceeded:
+            for host, cert_info in sweep.abandon():
+                yield host, cert_info
+            async for host in hostnames:
+                yield host, _build_failed_cert('DEADLINE_EXCEEDED')
+
+    finally:
+        # Don't leave pending hosts running if the caller stops iterating early
+        sweep.cancel()
+        # ...and wait on the decode pool (as in `iter_certs_please`) without blocking the event loop
+        if decode_pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, decode_pool.shutdown)
+
+
+async def _connect_happy_eyeballs(addr_infos: list[tuple],
+                                  delay: float = _HAPPY_EYEBALLS_DELAY) -> socket.socket:
+    """
+    Race connections to each of ``addr_infos``, as returned by :func:`socket.getaddrinfo`,
+    and return the first connected (non-blocking) socket.
+
+    This is the coroutine version of :func:`cert_hero.cert_hero._connect_happy_eyeballs`;
+    the caller is expected to bound it with a timeout.
+    """
+    loop = asyncio.get_running_loop()
+    addr_infos = _interleave_addr_infos(addr_infos)
+    last_error: OSError = OSError('No addresses to connect to')
+    pending = set()
+
+    try:
+        for i, addr_info in enumerate(addr_infos, 1):
+            pending.add(asyncio.ensure_future(_sock_connect(loop, addr_info)))
+            is_last = i == len(addr_infos)
+
+            # wait until a connection succeeds, fails, or it's time to start the next attempt
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if is_last else delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if socks := [task.result() for task in done if not task.exception()]:
+                    # close any connections which tied for the win
+                    for sock in socks[1:]:
+                        sock.close()
+                    return socks[0]
+
+                for task in done:
+                    last_error = task.exception()
+
+                # start the next attempt right away
+                if not is_last:
+                    break
+
+        raise last_error
+
+    finally:
+        # close any connections which lost the race
+        for task in pending:
+            task.cancel()
+
+
+async def _sock_connect(loop: asyncio.AbstractEventLoop, addr_info: tuple) -> socket.socket:
+    """Connect a new (non-blocking) socket to ``addr_info``."""
+    family, sock_type, proto, _, sock_addr = addr_info
+    sock = socket.socket(family, sock_type, proto)
+
+    try:
+        sock.setblocking(False)
+        await loop.sock_connect(sock, sock_addr)
+    except BaseException:
+        sock.close()
+        raise
+
+    return sock
+
+
+async def _read_http_head(reader: asyncio.StreamReader) -> bytes:
+    """
+    Read the head of an HTTP response (the status line and headers) from ``reader``.
+
+    Reading stops at the end of the headers, at EOF, or once the stream's buffer
+    limit (:data:`_MAX_HEAD_SIZE`) is reached, so a large response body is never
+    downloaded.
+    """
+    try:
+        return await reader.readuntil(_END_OF_HEAD)
+    except asyncio.IncompleteReadError as e:
+        # EOF before the end of the headers
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        # headers are too large; settle for what is in the buffer
+        return await reader.read(e.consumed)
+
+
+def _aiter(hostnames: Iterable[str | tuple[str, int]] | AsyncIterable[str | tuple[str, int]],
+           ports: Iterable[int] | None = None) -> AsyncIterator[str | tuple[str, int]]:
+    """
+    Return an async iterator over ``hostnames``, which may be a sync or async iterable,
+    with each host fanned out across ``ports`` (see :func:`_expand_targets`).
+    """
+    if not hasattr(hostnames, '__aiter__'):
+        async def _gen():
+            for target in _expand_targets(hostnames, ports):
+                yield target
+
+        return _gen()
+
+    if ports is None:
+        return hostnames.__aiter__()
+
+    async def _agen():
+        async for target in hostnames:
+            for _target in _expand_targets((target, ), ports):
+                yield _target
+
+    return _agen()
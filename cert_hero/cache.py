@@ -0,0 +1,108 @@
+"""Persistent (on-disk) cache of scan results."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from datetime import date, datetime, timedelta
+from json import dumps, loads
+from time import time
+
+from .cert_hero import CertHero, _target_key
+
+
+class CertCache:
+    """
+    :class:`CertCache` is a persistent cache of SSL certificates, backed by a local
+    SQLite database and keyed by ``host:port``. It stores both the DER-encoded (binary)
+    cert and the parsed :class:`CertHero`.
+
+    A cached cert is served for up to ``max_age`` seconds after it was scanned, but
+    never once it's within ``expiry_margin`` of its *Not After* date - at that point
+    the cert has likely been renewed, so the host is scanned again.
+
+    Pass a :class:`CertCache` to a sweep, so that recently scanned hosts are answered
+    locally, without a network round trip::
+
+        >>> from cert_hero import CertCache, certs_please
+        >>> with CertCache('certs.db', max_age=24 * 60 * 60) as cache:
+        ...     host_to_cert = certs_please(['google.com', 'cnn.com'], cache=cache)
+
+    Only successful results are cached.
+    """
+
+    def __init__(self,
+                 path: str = 'cert_hero.db',
+                 max_age: float = 24 * 60 * 60,
+                 expiry_margin: timedelta = timedelta(days=1)):
+        self.path = path
+        self.max_age = max_age
+        self.expiry_margin = expiry_margin
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # make each (small) write cheap, since results are saved one at a time
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS certs ('
+            ' target TEXT PRIMARY KEY,'
+            ' der BLOB,'
+            ' cert TEXT NOT NULL,'
+            ' not_after TEXT NOT NULL,'
+            ' scanned_at REAL NOT NULL'
+            ')'
+        )
+        self._conn.commit()
+
+    def get(self, target: str | tuple[str, int]) -> CertHero | None:
+        """
+        Return the cached cert for ``target`` (``host``, ``host:port``, or ``(host, port)``),
+        or ``None`` if there is no fresh entry for it.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT der, cert FROM certs WHERE target = ? AND scanned_at >= ? AND not_after > ?',
+                (_target_key(target), time() - self.max_age, (self._today() + self.expiry_margin).isoformat()),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        der, cert = row
+        cert_info = CertHero.from_dict(loads(cert))
+        cert_info._der = der
+
+        return cert_info
+
+    def set(self, target: str | tuple[str, int], cert: CertHero) -> None:
+        """Cache the ``cert`` for ``target``, if it was retrieved successfully."""
+        if cert.get('Cert Status') != 'SUCCESS':
+            return
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO certs VALUES (?, ?, ?, ?, ?)',
+                (_target_key(target), cert.der, dumps(cert), cert.not_after_date.isoformat(), time()),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._conn.execute('DELETE FROM certs')
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.utcnow().date()
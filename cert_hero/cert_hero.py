@@ -1,18 +1,35 @@
 """Main module."""
 from __future__ import annotations
 
+import errno
+import os
+import selectors
 import ssl
 import socket
+import threading
 
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
 from datetime import datetime, date
-from itertools import repeat
+from hashlib import sha256
+from heapq import heappop, heappush
+from itertools import chain, count, islice, zip_longest
 from json import dumps
 from logging import getLogger
-from typing import Iterable
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
-from asn1crypto.x509 import Certificate
-from asn1crypto.keys import PublicKeyInfo
+from .resolver import _NEGATIVE_CACHE_ERRORS, Resolver
+from .stats import _Stopwatch
+
+if TYPE_CHECKING:  # pragma: no cover
+    from asn1crypto.keys import PublicKeyInfo
+    from asn1crypto.x509 import Certificate
+
+    from .cache import CertCache
+    from .journal import SweepJournal
+    from .policies import AdaptiveConcurrency, RateLimit, RetryPolicy
+    from .stats import SweepStats
 
 
 ### Utilities ###
@@ -40,24 +57,74 @@ KEY_MAP = {
     # 'commonName': 'Common Name',
 }
 
-_DEFAULT_USER_AGENT: str | None
+# Port to connect to, for targets that don't specify one
+_DEFAULT_PORT = 443
+
+# Delay (in seconds) between starting connection attempts to each address
+# of a host, as recommended in RFC 8305 ("Happy Eyeballs")
+_HAPPY_EYEBALLS_DELAY = 0.25
+
+# Return values of `socket.connect_ex()` for a non-blocking connection in progress
+_CONNECT_IN_PROGRESS = frozenset({0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN})
+
+# Max number of bytes to read for the head of an HTTP response
+_MAX_HEAD_SIZE = 16 * 1024
+
+# Marks the end of the head (status line and headers) of an HTTP response
+_END_OF_HEAD = b'\r\n\r\n'
 
-try:
-    from fake_useragent import FakeUserAgent
-except ImportError:  # no such module (fake_useragent)
-    _DEFAULT_USER_AGENT = 'python-requests/2.31.0'
+# Errors raised by `asn1crypto` for a malformed (or unsupported) cert. Anything else
+# raised while building a cert - e.g. a broken `decode_pool` - is not the cert's fault.
+_CERT_PARSE_ERRORS = (ValueError, TypeError, KeyError, IndexError, NotImplementedError)
 
-    def get_user_agent() -> str:
-        """Return the default *user agent*."""
-        return _DEFAULT_USER_AGENT
-else:  # module is available (fake_useragent)
-    _DEFAULT_USER_AGENT = None
+# Errors (`errno`) which mean there is no route to a host
+_UNREACHABLE_ERRORS = frozenset(
+    getattr(errno, name) for name in ('EHOSTUNREACH', 'ENETUNREACH', 'EHOSTDOWN', 'ENETDOWN')
+    if hasattr(errno, name)
+)
 
-    _FAKE_UA = FakeUserAgent()
+# Status of a host which was set aside by a `RateLimit`, to be tried later
+_THROTTLED = 'THROTTLED'
 
-    def get_user_agent() -> str:
-        """Return a random *user agent* using the ``fake_useragent`` module."""
-        return _FAKE_UA.__getattr__('random')
+# Max time (in seconds) between checks on whether a destination is still at the
+# cap of a `RateLimit`, when there is nothing else to wait on
+_THROTTLED_POLL_INTERVAL = 0.05
+
+# Statuses of failed hosts which may well succeed if retried
+_TRANSIENT_STATUSES = frozenset({
+    'DNS_ERROR', 'TIMED_OUT', 'CONNECTION_RESET', 'HOST_UNREACHABLE', 'SSL_EOF',
+})
+
+# *User agent* to use if the `fake_useragent` module is not installed
+_REQUESTS_USER_AGENT = 'python-requests/2.31.0'
+
+# `None` means that the *user agent* for each request comes from `get_user_agent()`
+_DEFAULT_USER_AGENT: str | None = None
+
+# Random *user agent* generator - or `False` if the `fake_useragent` module is not installed.
+# Creating one loads a data file, so it's deferred until the first call to `get_user_agent()`.
+_FAKE_UA = None
+_FAKE_UA_LOCK = threading.Lock()
+
+
+def get_user_agent() -> str:
+    """
+    Return a random *user agent* using the ``fake_useragent`` module, if it's
+    installed, else the default *user agent* (``python-requests/{version}``).
+    """
+    global _FAKE_UA
+
+    if _FAKE_UA is None:
+        with _FAKE_UA_LOCK:
+            if _FAKE_UA is None:
+                try:
+                    from fake_useragent import FakeUserAgent
+                except ImportError:  # no such module (fake_useragent)
+                    _FAKE_UA = False
+                else:
+                    _FAKE_UA = FakeUserAgent()
+
+    return _FAKE_UA.__getattr__('random') if _FAKE_UA else _REQUESTS_USER_AGENT
 
 
 def create_ssl_context() -> ssl.SSLContext:
@@ -125,6 +192,69 @@ def _build_failed_cert(reason: str):
     return _cert
 
 
+def _build_throttled_cert(destination: str) -> CertHero:
+    """
+    Build a :class:`CertHero` object for a host which was not tried, as its ``destination``
+    (IP address or subnet) is at the cap of a :class:`RateLimit`. A sweep sets the host
+    aside until that destination has a free slot; it's never returned to the caller.
+    """
+    _cert = _build_failed_cert(_THROTTLED)
+    _cert._destination = destination
+    return _cert
+
+
+def _failure_status(e: BaseException) -> str:
+    """
+    Return the ``Cert Status`` for a host which failed with the error ``e``, such as
+    ``DNS_NOT_FOUND`` or ``CONNECTION_REFUSED``.
+
+    Failures which may well succeed on a retry (e.g. ``TIMED_OUT``) are in
+    :data:`_TRANSIENT_STATUSES`.
+    """
+    if isinstance(e, socket.gaierror):
+        # e.g. NXDOMAIN, as opposed to a DNS server which didn't respond in time
+        return 'DNS_NOT_FOUND' if e.errno in _NEGATIVE_CACHE_ERRORS else 'DNS_ERROR'
+
+    if isinstance(e, socket.timeout):
+        return 'TIMED_OUT'
+
+    if isinstance(e, ConnectionRefusedError):
+        return 'CONNECTION_REFUSED'
+
+    if isinstance(e, ssl.SSLEOFError):
+        # SSL/TLS connection terminated abruptly.
+        # message: "EOF occurred in violation of protocol"
+        # this could indicate bad cert or website is down
+        return 'SSL_EOF'
+
+    if isinstance(e, ssl.SSLError):
+        return 'SSL_ERROR'
+
+    if isinstance(e, (ConnectionResetError, ConnectionAbortedError, BrokenPipeError)):
+        return 'CONNECTION_RESET'
+
+    if isinstance(e, OSError) and e.errno in _UNREACHABLE_ERRORS:
+        return 'HOST_UNREACHABLE'
+
+    return 'ERROR'
+
+
+def _min_timeout(timeout: float | None, other: float) -> float:
+    """Return the lesser of two timeouts (in seconds), where ``None`` means no timeout."""
+    other = max(other, 0)
+    return other if timeout is None else min(timeout, other)
+
+
+def _set_timings(cert: CertHero,
+                 phases: dict[str, float],
+                 tls_version: str | None,
+                 cipher: tuple[str, str, int] | None) -> None:
+    """Record the time spent in each phase, and the negotiated TLS version and cipher, on ``cert``."""
+    cert._timings = phases
+    cert._tls_version = tls_version
+    cert._cipher = cipher[0] if cipher else None
+
+
 def _key_algo(cert: Certificate) -> str:
     pub_key: PublicKeyInfo = cert.public_key
     # print(pub_key.native)
@@ -142,6 +272,446 @@ def _sig_algo(cert: Certificate) -> str:
     return algorithm.upper().replace('_', 'WITH', 1)
 
 
+def _subject_name(cert: Certificate) -> dict[str, str]:
+    return {KEY_MAP.get(k, k): v for k, v in cert.subject.native.items()}
+
+
+def _issuer_name(cert: Certificate) -> dict[str, str]:
+    return {KEY_MAP.get(k, k): v for k, v in cert.issuer.native.items()}
+
+
+def _validity(cert: Certificate) -> dict[str, str]:
+    return {
+        'Not After': cert.not_valid_after.date().isoformat(),
+        'Not Before': cert.not_valid_before.date().isoformat(),
+    }
+
+
+def _wildcard(cert: Certificate) -> bool:
+    return cert.subject.native.get('common_name', '').startswith('*')
+
+
+def _subject_alt_names(cert: Certificate) -> list[str] | None:
+    return (value := cert.subject_alt_name_value) and value.native
+
+
+# Fields of a (successful) `CertHero`, in order, along with how to compute each
+# one from a `Certificate`.
+_CERT_FIELDS = {
+    'Serial': lambda cert: format(cert.serial_number, 'X'),
+    'Subject Name': _subject_name,
+    'Issuer Name': _issuer_name,
+    'Validity': _validity,
+    'Wildcard': _wildcard,
+    'Signature Algorithm': _sig_algo,
+    'Key Algorithm': _key_algo,
+    'Subject Alt Names': _subject_alt_names,
+}
+
+# Fields which are left out when empty
+_OPTIONAL_CERT_FIELDS = frozenset({'Subject Alt Names'})
+
+
+def _interleave_addr_infos(addr_infos: list[tuple]) -> list[tuple]:
+    """
+    Reorder the results of :func:`socket.getaddrinfo` so that address families alternate,
+    starting with the family of the first (e.g. preferred) address, as per RFC 8305.
+    """
+    family_to_infos = {}
+    for addr_info in addr_infos:
+        family_to_infos.setdefault(addr_info[0], []).append(addr_info)
+
+    return [addr_info
+            for group in zip_longest(*family_to_infos.values())
+            for addr_info in group
+            if addr_info is not None]
+
+
+def _connect_happy_eyeballs(addr_infos: list[tuple],
+                            timeout: float | None,
+                            delay: float = _HAPPY_EYEBALLS_DELAY) -> socket.socket:
+    """
+    Race (non-blocking) connections to each of ``addr_infos``, as returned by
+    :func:`socket.getaddrinfo`, and return the first connected socket.
+
+    A new connection attempt is started every ``delay`` seconds, or as soon as
+    the previous attempt fails, so that a dead (or slow) address doesn't hold up
+    the others. Connections which lose the race are closed.
+
+    :raises OSError: If every connection attempt fails, or ``timeout`` (if not ``None``) expires first.
+    """
+    pending = deque(_interleave_addr_infos(addr_infos))
+    end_time = None if timeout is None else monotonic() + timeout
+    next_attempt = 0.0
+    last_error: OSError = OSError('No addresses to connect to')
+
+    with selectors.DefaultSelector() as selector:
+        try:
+            while pending or selector.get_map():
+                now = monotonic()
+                if end_time is not None and now >= end_time:
+                    raise socket.timeout('timed out')
+
+                if pending and (now >= next_attempt or not selector.get_map()):
+                    family, sock_type, proto, _, sock_addr = pending.popleft()
+                    try:
+                        sock = socket.socket(family, sock_type, proto)
+                    except OSError as e:
+                        # e.g. an IPv6 address, on a host without IPv6 support
+                        last_error = e
+                        next_attempt = 0.0
+                        continue
+
+                    try:
+                        sock.setblocking(False)
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                        err = sock.connect_ex(sock_addr)
+                    except OSError as e:
+                        sock.close()
+                        last_error = e
+                        next_attempt = 0.0
+                        continue
+
+                    if err in _CONNECT_IN_PROGRESS:
+                        selector.register(sock, selectors.EVENT_WRITE)
+                        next_attempt = now + delay
+                    else:
+                        sock.close()
+                        last_error = OSError(err, os.strerror(err))
+                        # start the next attempt right away
+                        next_attempt = 0.0
+                    continue
+
+                wait_time = None if end_time is None else max(end_time - now, 0)
+                if pending:
+                    wait_time = _min_timeout(wait_time, next_attempt - now)
+
+                for key, _ in selector.select(wait_time):
+                    sock = key.fileobj
+                    selector.unregister(sock)
+
+                    if err := sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+                        sock.close()
+                        last_error = OSError(err, os.strerror(err))
+                        # start the next attempt right away
+                        next_attempt = 0.0
+                    else:
+                        sock.setblocking(True)
+                        return sock
+
+            raise last_error
+
+        finally:
+            # close any connections which lost the race
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+
+
+def _split_target(target: str | tuple[str, int]) -> tuple[str, int | None]:
+    """
+    Split a ``target`` into a two-tuple of ``(host, port)``, where ``port``
+    is ``None`` if the target doesn't specify one.
+
+    A ``target`` can be a hostname or IP address, optionally followed by a port
+    (``host:port``, or ``[v6]:port`` for an IPv6 address), or a ``(host, port)``
+    tuple.
+    """
+    if isinstance(target, tuple):
+        return target
+
+    if target.startswith('['):
+        # [v6] or [v6]:port
+        host, _, port = target[1:].partition(']')
+        port = port.lstrip(':')
+    elif target.count(':') == 1:
+        host, port = target.split(':')
+    else:
+        # hostname, IPv4 address, or IPv6 address without a port
+        host, port = target, None
+
+    return host, int(port) if port else None
+
+
+def _parse_target(target: str | tuple[str, int],
+                  port: int | None = None) -> tuple[str, int]:
+    """
+    Parse a ``target`` into a two-tuple of ``(host, port)``. If a ``port`` is
+    passed in explicitly, it takes precedence over the one in ``target``.
+
+    >>> _parse_target('example.com:8443')
+    ('example.com', 8443)
+    >>> _parse_target('[::1]:636')
+    ('::1', 636)
+    >>> _parse_target('::1')
+    ('::1', 443)
+
+    :raises ValueError: If ``target`` is malformed, e.g. ``example.com:https``.
+    """
+    host, target_port = _split_target(target)
+
+    if port is None:
+        port = _DEFAULT_PORT if target_port is None else target_port
+
+    if not host or not 0 < port < 65536:
+        raise ValueError(f'invalid target: {target!r}')
+
+    return host, port
+
+
+def _target_key(target: str | tuple[str, int]) -> str:
+    """
+    Return the ``host:port`` (or ``[v6]:port``) for a ``target``, which is the same
+    for every form of it - e.g. ``host``, ``host:443`` and ``('host', 443)``.
+
+    A malformed ``target`` (see :func:`_parse_target`) is its own key.
+    """
+    try:
+        host, port = _parse_target(target)
+    except ValueError:
+        return str(target)
+    return f'[{host}]:{port}' if ':' in host else f'{host}:{port}'
+
+
+def _expand_targets(targets: Iterable[str | tuple[str, int]],
+                    ports: Iterable[int] | None = None) -> Iterator[str | tuple[str, int]]:
+    """
+    Fan out each target (without an explicit port) across each of ``ports``,
+    as a ``(host, port)`` tuple. If ``ports`` is not passed in, ``targets``
+    are returned as-is, as are any malformed targets - which are reported as
+    ``INVALID_TARGET`` when they are scanned.
+    """
+    if ports is None:
+        yield from targets
+        return
+
+    ports = tuple(ports)
+
+    for target in targets:
+        try:
+            host, port = _split_target(target)
+        except ValueError:
+            yield target
+            continue
+        if port is None:
+            for port in ports:
+                yield host, port
+        else:
+            yield host, port
+
+
+def _http_request(hostname: str, user_agent: str, port: int = 443) -> bytes:
+    """
+    Build the (encoded) HTTP request used to retrieve ``Location`` and ``Status``
+    for a host.
+    """
+    host = f'[{hostname}]' if ':' in hostname else hostname
+    if port != _DEFAULT_PORT:
+        host = f'{host}:{port}'
+
+    headers = (
+        f'GET / HTTP/1.0\r\n'
+        f'Host: {host}\r\n'
+        f'User-Agent: {user_agent}\r\n'
+        'Accept-Encoding: gzip, deflate\r\n'
+        'Accept: */*\r\n'
+        '\r\n'
+    )
+    # print("\n\n" + headers)
+
+    return headers.encode()
+
+
+def _recv_http_head(sock: socket.socket, max_size: int = _MAX_HEAD_SIZE) -> bytes:
+    """
+    Read the head of an HTTP response (the status line and headers) from ``sock``.
+
+    Reading stops at the end of the headers (a blank line), at EOF, or once
+    ``max_size`` bytes are read - whichever comes first - so that a large (or
+    endless) response body is never downloaded. Bytes are read directly into
+    a pre-allocated buffer, rather than concatenated chunk by chunk.
+    """
+    buf = bytearray(max_size)
+    size = 0
+
+    with memoryview(buf) as view:
+        while size < max_size:
+            num_bytes = sock.recv_into(view[size:])
+            if not num_bytes:
+                break
+            # only search the new bytes, plus the 3 before them in case
+            # the `\r\n\r\n` is split between two reads.
+            start = max(size - 3, 0)
+            size += num_bytes
+            if buf.find(_END_OF_HEAD, start, size) != -1:
+                break
+
+    del buf[size:]
+    return bytes(buf)
+
+
+def _parse_http_response(data: bytes,
+                         default_encoding='latin-1') -> tuple[int | None, str | None]:
+    """
+    Parse the *status code* and ``Location`` header from the head of a raw HTTP response.
+
+    :return: A two-tuple of (status_code, location)
+    """
+    # Ignore any part of the body which might have been read
+    head = data.split(_END_OF_HEAD, 1)[0]
+
+    #  Latin-1 (or ISO-8859-1) is a safe default: it will always
+    #  decode any bytes (though the result may not be useful).
+    response = head.decode(default_encoding)
+
+    # Get the first line (the "status line")
+    # Ref: https://developer.mozilla.org/en-US/docs/Web/HTTP/Messages
+    status_line = response.split('\n', 1)[0]
+
+    # HTTP/1.1 301 Moved Permanently
+    try:
+        status_code = int(status_line.split(' ', 2)[1])
+    except (ValueError, TypeError, IndexError):
+        status_code = None
+
+    # print(response)  # print receive response
+
+    # header names are case-insensitive
+    loc = None
+    if (loc_start := response.lower().find('\nlocation:')) != -1:
+        loc = response[loc_start + 10:].split('\r\n', maxsplit=1)[0].strip()
+
+    return status_code, loc
+
+
+def _build_cert(cert_bin: bytes,
+                loc: str | None = None,
+                status_code: int | None = None,
+                lazy: bool = False,
+                decode_pool: Executor | None = None) -> CertHero:
+    """
+    Build a :class:`CertHero` object from the DER-encoded (binary) form of an
+    SSL certificate, along with the ``Location`` and ``Status`` of the host.
+
+    Many hosts present the very same cert (e.g. a wildcard or CDN cert), so each
+    cert is only parsed once: the result is cached by its SHA-256 fingerprint,
+    and shared between hosts - except for ``Validity``, which is copied, as it's
+    updated by :func:`set_expired`.
+
+    If ``lazy`` is true, return a :class:`LazyCertHero` instead, which decodes
+    each field only when it's accessed.
+
+    If a ``decode_pool`` (e.g. a :class:`ProcessPoolExecutor`) is passed in, a cert
+    which is not yet cached is parsed in that pool, and the calling thread waits
+    on the result without holding the GIL.
+    """
+    if lazy:
+        return LazyCertHero(cert_bin, loc, status_code)
+
+    fingerprint = sha256(cert_bin).hexdigest().upper()
+
+    if (parsed := _PARSED_CERTS.get(fingerprint)) is None:
+        if decode_pool is None:
+            parsed = _parse_cert(cert_bin)
+        else:
+            parsed = decode_pool.submit(_parse_cert_remote, cert_bin).result()
+            parsed._der = cert_bin
+        _PARSED_CERTS[fingerprint] = parsed
+
+    cert_info = CertHero(parsed)
+    cert_info['Validity'] = parsed['Validity'].copy()
+
+    cert_info._not_after_date = parsed._not_after_date
+    cert_info._not_before_date = parsed._not_before_date
+    cert_info._der = parsed._der
+    cert_info._fingerprint = fingerprint
+
+    if loc:
+        cert_info['Location'] = loc
+
+    if status_code:
+        cert_info['Status'] = status_code
+
+    return cert_info
+
+
+def _parse_cert(cert_bin: bytes) -> CertHero:
+    """
+    Parse the DER-encoded (binary) form of an SSL certificate into a
+    :class:`CertHero` object.
+    """
+    # imported here, as `asn1crypto` takes a while to import, and isn't needed until a cert is parsed
+    from asn1crypto.x509 import Certificate
+
+    _cert: Certificate = Certificate.load(cert_bin)
+
+    # print(_cert)
+    # print(dumps(_cert.native, default=str))
+    # print(_cert.self_signed)
+
+    # print(dict(_cert.subject.native))
+    # print(dict(_cert.issuer.native))
+    # pprint(_cert.native)
+    # print(_cert.subject_alt_name_value.native)
+
+    cert_info = CertHero({'Cert Status': 'SUCCESS'})
+
+    for key, field in _CERT_FIELDS.items():
+        if (value := field(_cert)) or key not in _OPTIONAL_CERT_FIELDS:
+            cert_info[key] = value
+
+    cert_info._not_after_date = _cert.not_valid_after.date()
+    cert_info._not_before_date = _cert.not_valid_before.date()
+    cert_info._der = cert_bin
+
+    return cert_info
+
+
+def _parse_cert_remote(cert_bin: bytes) -> CertHero:
+    """
+    Parse an SSL certificate in a worker (e.g. process) of a ``decode_pool``;
+    the DER-encoded cert is left out of the result, as the caller already has it.
+    """
+    cert_info = _parse_cert(cert_bin)
+    cert_info._der = None
+    return cert_info
+
+
+class _LRUCache:
+    """
+    A (thread-safe) mapping with at most ``maxsize`` items, which evicts the
+    least recently used item once full.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if (value := self._data.get(key)) is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Parsed certs, keyed by their SHA-256 fingerprint (see `_build_cert()`)
+_PARSED_CERTS = _LRUCache(maxsize=4096)
+
+
 ### Models ###
 
 class CertHero(dict):
@@ -169,6 +739,12 @@ class CertHero(dict):
     """
     _not_after_date: date
     _not_before_date: date
+    _der: bytes | None = None
+    _fingerprint: str | None = None
+    _timings: dict[str, float] | None = None
+    _elapsed: float | None = None
+    _tls_version: str | None = None
+    _cipher: str | None = None
 
     @classmethod
     def from_dict(cls, o: dict, _from_iso_format=date.fromisoformat):
@@ -178,6 +754,9 @@ class CertHero(dict):
         if validity := o.get('Validity'):
             obj._not_after_date = _from_iso_format(validity['Not After'])
             obj._not_before_date = _from_iso_format(validity['Not Before'])
+        else:
+            # a failed host, as with `_build_failed_cert()`
+            obj._not_after_date = obj._not_before_date = date.min
 
         return obj
 
@@ -191,6 +770,41 @@ class CertHero(dict):
         """The Cert *Not Before* Date (e.g. Valid From)"""
         return self._not_before_date
 
+    @property
+    def der(self) -> bytes | None:
+        """The DER-encoded (binary) form of the Cert, if available"""
+        return self._der
+
+    @property
+    def fingerprint(self) -> str | None:
+        """The SHA-256 Fingerprint of the Cert (in hex), if available"""
+        if self._fingerprint is None and self._der is not None:
+            self._fingerprint = sha256(self._der).hexdigest().upper()
+        return self._fingerprint
+
+    @property
+    def timings(self) -> dict[str, float] | None:
+        """
+        The time (in seconds) spent in each phase of retrieving the Cert - ``dns``, ``connect``,
+        ``handshake``, ``http``, ``parse`` and ``total`` - if it was retrieved with ``timings=True``
+        """
+        return self._timings
+
+    @property
+    def elapsed(self) -> float | None:
+        """The time (in seconds) it took to retrieve the Cert - or to fail to - if available"""
+        return self._elapsed
+
+    @property
+    def tls_version(self) -> str | None:
+        """The negotiated TLS version (e.g. ``TLSv1.3``), if it was retrieved with ``timings=True``"""
+        return self._tls_version
+
+    @property
+    def cipher(self) -> str | None:
+        """The negotiated cipher, if it was retrieved with ``timings=True``"""
+        return self._cipher
+
     def __repr__(self, indent=2):
         """
         Return a human-readable string with the (prettified) JSON string value enclosed
@@ -212,12 +826,200 @@ class CertHero(dict):
     __str__ = dumps
 
 
+class LazyCertHero(CertHero):
+    """
+    :class:`LazyCertHero` is a :class:`CertHero` which holds on to the DER-encoded
+    (binary) cert, and only decodes it - one field at a time - when a field is
+    accessed, or when the object is iterated over or serialized.
+
+    For example, an expiry check only needs to decode the *Validity* of the cert,
+    and can skip the subject, issuer, SANs, and algorithms entirely:
+
+    >>> import cert_hero
+    >>> cert = cert_hero.cert_please('google.com', lazy=True)
+    >>> cert.not_after_date
+    datetime.date(2023, 10, 28)
+
+    Otherwise, it behaves the same as a :class:`CertHero` object.
+    """
+    # Fields which are not yet decoded
+    _pending: tuple[str, ...] = ()
+    _x509: Certificate | None = None
+
+    def __init__(self, cert_bin: bytes,
+                 loc: str | None = None,
+                 status_code: int | None = None):
+        super().__init__({'Cert Status': 'SUCCESS'})
+
+        self._der = cert_bin
+        self._pending = tuple(_CERT_FIELDS)
+        self._extra = {}
+
+        if loc:
+            self._extra['Location'] = loc
+
+        if status_code:
+            self._extra['Status'] = status_code
+
+    @property
+    def x509(self) -> Certificate:
+        """The (lazily) parsed :class:`asn1crypto.x509.Certificate`"""
+        if self._x509 is None:
+            from asn1crypto.x509 import Certificate
+            self._x509 = Certificate.load(self._der)
+        return self._x509
+
+    @property
+    def not_after_date(self) -> date:
+        """The Cert *Not After* Date (e.g. Valid Until)"""
+        try:
+            return self._not_after_date
+        except AttributeError:
+            self._not_after_date = self.x509.not_valid_after.date()
+            return self._not_after_date
+
+    @property
+    def not_before_date(self) -> date:
+        """The Cert *Not Before* Date (e.g. Valid From)"""
+        try:
+            return self._not_before_date
+        except AttributeError:
+            self._not_before_date = self.x509.not_valid_before.date()
+            return self._not_before_date
+
+    def _decode(self, key: str) -> None:
+        """Decode the field ``key``, if it's still pending."""
+        if key in self._pending:
+            self._pending = tuple(k for k in self._pending if k != key)
+            if (value := _CERT_FIELDS[key](self.x509)) or key not in _OPTIONAL_CERT_FIELDS:
+                dict.__setitem__(self, key, value)
+
+    def _decode_all(self) -> None:
+        """Decode any pending fields, and put all fields in the usual order."""
+        if self._pending or self._extra:
+            for key in self._pending:
+                self._decode(key)
+
+            current = dict(dict.items(self))
+            ordered = {}
+            for key in ('Cert Status', *_CERT_FIELDS):
+                if key in current:
+                    ordered[key] = current.pop(key)
+            ordered.update(self._extra)
+            ordered.update(current)
+
+            self._extra = {}
+            dict.clear(self)
+            dict.update(self, ordered)
+
+    def __getitem__(self, key):
+        self._decode(key)
+        if key in self._extra:
+            return self._extra[key]
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        if key in self._pending:
+            if key not in _OPTIONAL_CERT_FIELDS:
+                return True
+            self._decode(key)
+        return key in self._extra or super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        if key in self._pending:
+            self._pending = tuple(k for k in self._pending if k != key)
+        self._extra.pop(key, None)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._decode_all()
+        super().__delitem__(key)
+
+    def __iter__(self):
+        self._decode_all()
+        return super().__iter__()
+
+    def __len__(self):
+        self._decode_all()
+        return super().__len__()
+
+    def __bool__(self):
+        # never empty, as `Cert Status` is always set
+        return True
+
+    def __eq__(self, other):
+        self._decode_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        self._decode_all()
+        return super().__ne__(other)
+
+    __hash__ = None
+
+    def keys(self):
+        self._decode_all()
+        return super().keys()
+
+    def values(self):
+        self._decode_all()
+        return super().values()
+
+    def items(self):
+        self._decode_all()
+        return super().items()
+
+    def copy(self):
+        self._decode_all()
+        return super().copy()
+
+    def pop(self, *args):
+        self._decode_all()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._decode_all()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self._decode_all()
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self._decode_all()
+        return super().update(*args, **kwargs)
+
+    def __reduce_ex__(self, protocol):
+        # Pickle as a regular (fully decoded) `CertHero`
+        self._decode_all()
+        _ = self.not_after_date, self.not_before_date
+        state = {k: v for k, v in self.__dict__.items() if k not in ('_x509', '_pending', '_extra')}
+        return CertHero, (dict(self),), state
+
+
 ### Core functions ###
 
-def cert_please(hostname: str,
+def cert_please(hostname: str | tuple[str, int],
                 context: ssl.SSLContext = None,
                 user_agent: str | None = _DEFAULT_USER_AGENT,
                 default_encoding='latin-1',
+                cert_only: bool = False,
+                timeout: float | None = 3,
+                connect_timeout: float | None = None,
+                handshake_timeout: float | None = None,
+                read_timeout: float | None = None,
+                port: int | None = None,
+                happy_eyeballs_delay: float = _HAPPY_EYEBALLS_DELAY,
+                resolver: Resolver | None = None,
+                lazy: bool = False,
+                decode_pool: Executor | None = None,
+                timings: bool = False,
                 ) -> CertHero[str, str | int | dict[str, str | bool]] | None:
     """
     Retrieve the SSL certificate for a given ``hostname`` - works even
@@ -290,7 +1092,8 @@ def cert_please(hostname: str,
     ..  _source: https://stackoverflow.com/a/74349032/10237506
     .. _self-signed certificate: https://stackoverflow.com/a/68889470/10237506
 
-    :param hostname: Host (or server) to retrieve SSL Certificate for
+    :param hostname: Host (or server) to retrieve SSL Certificate for. This can optionally
+      include a port - e.g. ``host:8443`` or ``[v6]:8443`` - or be a ``(host, port)`` tuple.
     :param context: (Optional) Shared SSL Context
     :param user_agent: A custom *user agent* to use for the HTTP call to retrieve ``Location`` and ``Status``.
       Defaults to ``python-requests/{version}``, or a random *user agent* if the ``fake_useragent`` module
@@ -298,160 +1101,344 @@ def cert_please(hostname: str,
       `extra <https://packaging.python.org/en/latest/tutorials/installing-packages/#installing-extras>`__).
     :param default_encoding: Encoding used to decode bytes for the HTTP call to retrieve ``Location``
       and ``Status``. Defaults to ``latin-1`` (or ISO-8859-1).
+    :param cert_only: If true, close the connection right after the TLS handshake, and skip the HTTP
+      call to retrieve ``Location`` and ``Status``. This saves a round trip per host, and also works
+      for TLS services which don't speak HTTP.
+    :param timeout: Default timeout (in seconds) for each step below, if not otherwise specified,
+      or ``None`` for no timeout.
+    :param connect_timeout: Timeout (in seconds) to establish the TCP connection.
+    :param handshake_timeout: Timeout (in seconds) for the TLS handshake.
+    :param read_timeout: Timeout (in seconds) for each socket operation in the HTTP call to retrieve
+      ``Location`` and ``Status``.
+    :param port: Port to connect to. Defaults to the port in ``hostname``, if any, else ``443``.
+    :param happy_eyeballs_delay: If ``hostname`` resolves to several (IPv4 or IPv6) addresses, connections
+      to each are raced, staggered by this many seconds; the first successful connection wins
+      (`Happy Eyeballs <https://datatracker.ietf.org/doc/html/rfc8305>`__).
+    :param resolver: (Optional) Shared :class:`Resolver`, to cache DNS lookups (or to use
+      pre-resolved addresses) across calls.
+    :param lazy: If true, return a :class:`LazyCertHero`, which only decodes each field of the
+      cert when it's accessed (or serialized).
+    :param decode_pool: (Optional) Executor - usually a :class:`ProcessPoolExecutor` - to decode
+      the cert in, so that parsing doesn't hold the GIL in this (I/O) thread.
+    :param timings: If true, record the time spent in each phase (see :attr:`CertHero.timings`),
+      along with the negotiated TLS version and cipher, on the result.
+    :return: The SSL Certificate (e.g. :class:`CertHero`) for the host, or ``None`` if it could not be
+      retrieved. Sweeps such as :func:`certs_please` instead report why, in the ``Cert Status``.
+
+    """
+    cert_info = _cert_please(
+        hostname, context, user_agent, default_encoding, cert_only, timeout, connect_timeout,
+        handshake_timeout, read_timeout, port, happy_eyeballs_delay, resolver, lazy, decode_pool, timings,
+    )
 
+    return cert_info if cert_info['Cert Status'] == 'SUCCESS' else None
+
+
+def _cert_please(hostname: str | tuple[str, int],
+                 context: ssl.SSLContext = None,
+                 user_agent: str | None = _DEFAULT_USER_AGENT,
+                 default_encoding='latin-1',
+                 cert_only: bool = False,
+                 timeout: float | None = 3,
+                 connect_timeout: float | None = None,
+                 handshake_timeout: float | None = None,
+                 read_timeout: float | None = None,
+                 port: int | None = None,
+                 happy_eyeballs_delay: float = _HAPPY_EYEBALLS_DELAY,
+                 resolver: Resolver | None = None,
+                 lazy: bool = False,
+                 decode_pool: Executor | None = None,
+                 timings: bool = False,
+                 rate_limit: RateLimit | None = None,
+                 ) -> CertHero[str, str | int | dict[str, str | bool]]:
+    """
+    Retrieve the SSL certificate for a given ``hostname``, as with :func:`cert_please`.
+
+    If it could not be retrieved, return a failed :class:`CertHero` instead of ``None``,
+    with the reason in ``Cert Status`` (see :func:`_failure_status`), and the time it
+    took in :attr:`CertHero.elapsed`.
+
+    If a ``rate_limit`` is passed in, and the destination of ``hostname`` is at its cap,
+    return right away with a ``Cert Status`` of ``THROTTLED`` (see :func:`_build_throttled_cert`).
     """
     if context is None:
         context = create_ssl_context()
 
-    # with socket.create_connection()
+    stopwatch = _Stopwatch()
+
+    try:
+        hostname, port = _parse_target(hostname, port)
+    except ValueError as e:
+        LOG.error(f'{e.__class__.__name__}: {e}. {hostname=} {port=}')
+        cert_info = _build_failed_cert('INVALID_TARGET')
+        cert_info._elapsed = stopwatch.elapsed()
+        return cert_info
+
+    status_code = loc = None
+    slot_ip = None
+
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(3)
+        if resolver is None:
+            addr_infos = socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+        else:
+            addr_infos = resolver.resolve(hostname, port)
+
+        stopwatch.lap('dns')
+
+        # hold a slot for the destination, if it's rate limited
+        if rate_limit is not None:
+            ip = addr_infos[0][4][0]
+            if (destination := rate_limit.acquire(ip)) is not None:
+                return _build_throttled_cert(destination)
+            slot_ip = ip
+
+        with _connect_happy_eyeballs(
+            addr_infos,
+            timeout if connect_timeout is None else connect_timeout,
+            happy_eyeballs_delay,
+        ) as sock:
+            stopwatch.lap('connect')
+
+            # upgrade the socket to SSL (this performs the TLS handshake)
+            sock.settimeout(timeout if handshake_timeout is None else handshake_timeout)
             with context.wrap_socket(
                 sock, server_hostname=hostname
             ) as wrap_socket:
-                wrap_socket.setsockopt(
-                    socket.SOL_SOCKET, socket.SO_REUSEADDR, 1
-                )
-
-                wrap_socket.connect((hostname, 443))
+                stopwatch.lap('handshake')
 
                 # get certificate
                 cert_bin: bytes = wrap_socket.getpeercert(True)  # type: ignore
+                tls_version, cipher = wrap_socket.version(), wrap_socket.cipher()
 
-                # use custom `user_agent` if passed in, else:
-                #   * use a random "user agent", if the `fake_useragent` module is installed,
-                #     else use the default "user agent" (python-requests)
-                if not user_agent:
-                    user_agent = get_user_agent()
-
-                LOG.debug('User Agent: %s', user_agent)
-
-                headers = (
-                    f'GET / HTTP/1.0\r\n'
-                    f'Host: {hostname}\r\n'
-                    f'User-Agent: {user_agent}\r\n'
-                    'Accept-Encoding: gzip, deflate\r\n'
-                    'Accept: */*\r\n'
-                    '\r\n'
-                )
-                # print("\n\n" + headers)
-
-                wrap_socket.send(headers.encode())  # send request
-
-                data = bytes()
-                while True:
-                    this_data = wrap_socket.recv(512)
-                    if not this_data:
-                        break
-                    data += this_data
-
-                #  Latin-1 (or ISO-8859-1) is a safe default: it will always
-                #  decode any bytes (though the result may not be useful).
-                response = data.decode(default_encoding)
-
-                # Get the first line (the "status line")
-                # Ref: https://developer.mozilla.org/en-US/docs/Web/HTTP/Messages
-                status_line = response.split('\n', 1)[0]
-
-                # HTTP/1.1 301 Moved Permanently
-                try:
-                    status_code = int(status_line.split(' ', 2)[1])
-                except (ValueError, TypeError):
-                    status_code = None
-
-                # print(response)  # print receive response
-
-                loc = None
-                if (loc_start := response.find('\nLocation: ')) != -1:
-                    loc = response[loc_start + 11:].split('\r\n', maxsplit=1)[
-                        0
-                    ]
-    except socket.gaierror as e:
-        # curl: (6) Could not resolve host: <hostname>
-        if e.errno == 8:
-            # [Errno 8] nodename nor servname provided, or not known
-            LOG.error(f'gaierror: could not resolve host. {hostname=}')
-            ...
-        else:
-            LOG.error(f'{e.__class__.__name__}: {e}. {hostname=}')
-        return None
-    except ssl.SSLEOFError:
-        # SSL/TLS connection terminated abruptly.
-        # message: "EOF occurred in violation of protocol"
-        # this could indicate bad cert or website is down
-        LOG.error(f'SSLEOFError: bad cert. {hostname=}')
-        return None
-    except ssl.SSLError as e:
-        #
-        LOG.error(f'{e.__class__.__name__}: {e}. {hostname=}')
-        return None
-    # except socket.error as e:
-    #     print(f'{e.__class__.__name__}: Error for {hostname}: {e}')
-    #     return None
+                if not cert_only:
+                    # use custom `user_agent` if passed in, else:
+                    #   * use a random "user agent", if the `fake_useragent` module is installed,
+                    #     else use the default "user agent" (python-requests)
+                    if not user_agent:
+                        user_agent = get_user_agent()
+
+                    LOG.debug('User Agent: %s', user_agent)
+
+                    wrap_socket.settimeout(timeout if read_timeout is None else read_timeout)
+                    wrap_socket.send(_http_request(hostname, user_agent, port))  # send request
+
+                    # only read up to the end of the headers; the body is not needed
+                    data = _recv_http_head(wrap_socket)
+
+                    status_code, loc = _parse_http_response(data, default_encoding)
+                    stopwatch.lap('http')
     except Exception as e:
-        LOG.error(f'{e.__class__.__name__}: General Error - {e}. {hostname=}')
-        return None
+        status = _failure_status(e)
+        LOG.error(f'{e.__class__.__name__}: {e}. {hostname=} {port=} {status=}')
+        cert_info = _build_failed_cert(status)
     else:
-        _cert: Certificate = Certificate.load(cert_bin)
-
-        # print(_cert)
-        # print(dumps(_cert.native, default=str))
-        # print(_cert.self_signed)
-
-        # print(dict(_cert.subject.native))
-        # print(dict(_cert.issuer.native))
-        # pprint(_cert.native)
-        # print(_cert.subject_alt_name_value.native)
-
-        cert_info = CertHero(
-            {
-                'Cert Status': 'SUCCESS',
-                'Serial': format(_cert.serial_number, 'X'),
-                'Subject Name': (
-                    subject := {
-                        KEY_MAP.get(k, k): v
-                        for k, v in _cert.subject.native.items()
-                    }
-                ),
-                'Issuer Name': {
-                    KEY_MAP.get(k, k): v for k, v in _cert.issuer.native.items()
-                },
-                'Validity': {
-                    'Not After': (
-                        not_after_date := _cert.not_valid_after.date()
-                    ).isoformat(),
-                    'Not Before': (
-                        not_before_date := _cert.not_valid_before.date()
-                    ).isoformat(),
-                },
-                'Wildcard': subject.get('Common Name', '').startswith('*'),
-                'Signature Algorithm': _sig_algo(_cert),
-                'Key Algorithm': _key_algo(_cert),
-            }
-        )
+        try:
+            cert_info = _build_cert(cert_bin, loc, status_code, lazy, decode_pool)
+        except _CERT_PARSE_ERRORS as e:
+            LOG.error(f'{e.__class__.__name__}: invalid cert - {e}. {hostname=} {port=}')
+            cert_info = _build_failed_cert('INVALID_CERT')
+        else:
+            stopwatch.lap('parse')
+            if timings:
+                _set_timings(cert_info, stopwatch.stop(), tls_version, cipher)
+    finally:
+        if slot_ip is not None:
+            rate_limit.release(slot_ip)
 
-        cert_info._not_after_date = not_after_date
-        cert_info._not_before_date = not_before_date
+    cert_info._elapsed = stopwatch.elapsed()
 
-        if subj_alt_names := _cert.subject_alt_name_value.native:
-            cert_info['Subject Alt Names'] = subj_alt_names
+    return cert_info
 
-        if loc:
-            cert_info['Location'] = loc
 
-        if status_code:
-            cert_info['Status'] = status_code
+class _Sweep:
+    """
+    The bookkeeping of a sweep which doesn't depend on its engine (threads or ``asyncio``),
+    shared by :func:`iter_certs_please` and :func:`async_iter_certs_please`: the hosts
+    in flight, waiting on a retry, or set aside by a ``rate_limit``, along with answers
+    from the ``journal`` or ``cache``, and the ``deadline``.
+
+    The engine starts each host handed out by :meth:`due`, as well as each new host which
+    :meth:`lookup` can't answer, and tracks it with :meth:`add`; once it's done, :meth:`complete`
+    returns its result, unless it's to be tried again.
+    """
 
-        return cert_info
+    def __init__(self,
+                 max_pending: int,
+                 clock: Callable[[], float],
+                 deadline: float | None = None,
+                 retry: RetryPolicy | None = None,
+                 adaptive: AdaptiveConcurrency | None = None,
+                 rate_limit: RateLimit | None = None,
+                 journal: SweepJournal | None = None,
+                 cache: CertCache | None = None):
+        self.max_pending = max_pending
+        self.clock = clock
+        self.retry = retry
+        self.adaptive = adaptive
+        self.rate_limit = rate_limit
+        self.journal = journal
+        self.cache = cache
+
+        # future (or task) -> (host, attempt) for each host in flight
+        self.pending = {}
+        # (retry at, seq, host, attempt, last result) for each host waiting to be retried
+        self.retries = []
+        self._retry_seq = count()
+        self._retry_budget = None if retry is None else retry.budget()
+        # destination -> (host, attempt) for each host set aside by the `rate_limit`
+        self.throttled: dict[str, deque] = {}
+        self._num_throttled = 0
+
+        self.end_time = None if deadline is None else clock() + deadline
+
+    @property
+    def window(self) -> int:
+        """Max number of hosts in flight."""
+        return self.max_pending if self.adaptive is None else self.adaptive.limit
+
+    def can_submit(self) -> bool:
+        """Return true if there is room to start another host."""
+        return len(self.pending) < self.window and (self.rate_limit is None or self.rate_limit.delay() <= 0)
+
+    def can_read(self) -> bool:
+        """
+        Return true if there is room to start a new host. Hosts waiting to be tried again
+        also count against the window, so that at most ``window`` hosts are held at a time.
+        """
+        return (self.can_submit()
+                and len(self.pending) + len(self.retries) + self._num_throttled < self.window)
+
+    def due(self) -> Iterator[tuple[str | tuple[str, int], int]]:
+        """
+        Yield each ``(host, attempt)`` to start again, while there is room: first any retries
+        which are due, then hosts whose destination is no longer at its cap.
+        """
+        while self.retries and self.retries[0][0] <= self.clock() and self.can_submit():
+            _, _, host, attempt, _ = heappop(self.retries)
+            yield host, attempt
+
+        for destination in list(self.throttled):
+            if self.can_submit() and self.rate_limit.available(destination):
+                self._num_throttled -= 1
+                yield self.throttled[destination].popleft()
+                if not self.throttled[destination]:
+                    del self.throttled[destination]
+
+    def lookup(self, host: str | tuple[str, int]) -> CertHero | None:
+        """Return the result for a new ``host`` from the journal or the cache, if it's in either."""
+        if self.journal is not None and (cert_info := self.journal.get(host)) is not None:
+            return cert_info
+
+        if self.cache is not None and (cert_info := self.cache.get(host)) is not None:
+            if self.journal is not None:
+                self.journal.record(host, cert_info)
+            return cert_info
+
+        return None
+
+    def add(self, future, host: str | tuple[str, int], attempt: int) -> None:
+        """Track the ``future`` (or task) of an ``attempt`` at ``host``."""
+        if self.rate_limit is not None:
+            self.rate_limit.take()
+        if attempt == 1 and self._retry_budget is not None:
+            self._retry_budget.add_attempt()
+        self.pending[future] = host, attempt
+
+    def complete(self, future) -> tuple[str | tuple[str, int], CertHero | None]:
+        """
+        Return the host of a ``future`` (or task) which is done, along with its result -
+        or ``None``, if the host is set aside to be tried again.
+        """
+        host, attempt = self.pending.pop(future)
+        cert_info = future.result()
+
+        if cert_info['Cert Status'] == _THROTTLED:
+            # no connection was made, so the token taken for it goes back in the bucket
+            self.rate_limit.refund()
+            self.throttled.setdefault(cert_info._destination, deque()).append((host, attempt))
+            self._num_throttled += 1
+            return host, None
+
+        if self.adaptive is not None:
+            self.adaptive.record(cert_info)
+
+        if (self.retry is not None and self.retry.should_retry(cert_info, attempt)
+                and self._retry_budget.spend()):
+            retry_at = self.clock() + self.retry.delay(attempt)
+            heappush(self.retries, (retry_at, next(self._retry_seq), host, attempt + 1, cert_info))
+            return host, None
+
+        if self.cache is not None:
+            self.cache.set(host, cert_info)
+        if self.journal is not None:
+            self.journal.record(host, cert_info)
+
+        return host, cert_info
+
+    def idle(self) -> bool:
+        """Return true if no host is in flight, or waiting to be tried again."""
+        return not self.pending and not self.retries and not self.throttled
+
+    def timeout(self) -> float | None:
+        """Return how long (in seconds) to wait for a host to complete, before checking back in."""
+        now = self.clock()
+        timeout = None if self.end_time is None else max(self.end_time - now, 0)
+
+        if self.retries:
+            # wake up when the next retry is due
+            timeout = _min_timeout(timeout, self.retries[0][0] - now)
+
+        if self.rate_limit is not None and len(self.pending) < self.window:
+            if (delay := self.rate_limit.delay()) > 0:
+                # ...or when the next connection is allowed
+                timeout = _min_timeout(timeout, delay)
+            if self.throttled and not self.pending:
+                # a destination may be held by another sweep, which shares the `rate_limit`
+                timeout = _min_timeout(timeout, _THROTTLED_POLL_INTERVAL)
+
+        return timeout
+
+    def past_deadline(self) -> bool:
+        """Return true if the deadline of the sweep (if any) is exceeded."""
+        return self.end_time is not None and self.clock() >= self.end_time
+
+    def abandon(self) -> Iterator[tuple[str | tuple[str, int], CertHero]]:
+        """
+        Cancel the hosts in flight, once the deadline is exceeded, and yield each host
+        which is still outstanding: hosts waiting on a retry with their last result,
+        and the rest with a ``Cert Status`` of ``DEADLINE_EXCEEDED``.
+        """
+        self.cancel()
+
+        for *_, host, _, cert_info in sorted(self.retries):
+            yield host, cert_info
+
+        for host, _ in chain(self.pending.values(), *self.throttled.values()):
+            yield host, _build_failed_cert('DEADLINE_EXCEEDED')
+
+        self.retries.clear()
+        self.throttled.clear()
+        self._num_throttled = 0
+        self.pending.clear()
+
+    def cancel(self) -> None:
+        """Cancel the hosts in flight."""
+        for future in self.pending:
+            future.cancel()
 
 
 def certs_please(
-    hostnames: list[str] | tuple[str] | set[str],
+    hostnames: Iterable[str | tuple[str, int]],
     context: ssl.SSLContext = None,
     num_threads: int = 25,
     user_agent: str | None = _DEFAULT_USER_AGENT,
-) -> dict[str, CertHero]:
+    cert_only: bool = False,
+    deadline: float | None = None,
+    ports: Iterable[int] | None = None,
+    resolver: Resolver | None = None,
+    cache: CertCache | None = None,
+    **kwargs,
+) -> dict[str | tuple[str, int], CertHero]:
     """
     Retrieve (concurrently) the SSL certificate(s) for a list of ``hostnames`` - works
     even in the case of expired or self-signed certificates.
@@ -479,39 +1466,394 @@ def certs_please(
     >>> json.dumps(host_to_cert)
     {"google.com": {"Cert Status": "SUCCESS", ...}, "cnn.com": {"Cert Status": "SUCCESS", ...}, ...}
 
-    :param hostnames: List of hosts to retrieve SSL Certificate(s) for
+    :param hostnames: List (or any iterable) of hosts to retrieve SSL Certificate(s) for
     :param context: (Optional) Shared SSL Context
     :param num_threads: Max number of concurrent threads
     :param user_agent: A custom *user agent* to use for the HTTP call to retrieve ``Location`` and ``Status``.
       Defaults to ``python-requests/{version}``, or a random *user agent* if the ``fake_useragent`` module
       is installed (via the ``fake-ua``
       `extra <https://packaging.python.org/en/latest/tutorials/installing-packages/#installing-extras>`__).
-    :return: A mapping of ``hostname`` to the SSL Certificate (e.g. :class:`CertHero`) for that host
+    :param cert_only: If true, skip the HTTP call to retrieve ``Location`` and ``Status`` (see :func:`cert_please`).
+    :param deadline: Max number of seconds for the entire sweep. Any hosts which are still outstanding
+      at that point are abandoned, and reported with a ``Cert Status`` of ``DEADLINE_EXCEEDED``.
+    :param ports: (Optional) Ports to scan for each host in ``hostnames`` which doesn't specify a port
+      of its own, for example ``ports=(443, 8443)``. When passed in, each result is keyed by a
+      ``(host, port)`` tuple.
+    :param resolver: (Optional) Shared :class:`Resolver`, to cache DNS lookups (or to use pre-resolved
+      addresses). Defaults to a new :class:`Resolver` for this sweep.
+    :param cache: (Optional) Persistent :class:`CertCache`. Hosts with a fresh entry in the cache are
+      answered from it, without a network round trip, and new results are saved to it.
+    :param kwargs: Any additional keyword arguments - such as timeouts - to pass to :func:`cert_please`,
+      or ``decode_processes``, ``retry``, ``adaptive``, ``rate_limit``, ``journal`` and ``stats`` (see :func:`iter_certs_please`).
+    :return: A mapping of ``hostname`` (or ``(host, port)``) to the SSL Certificate (e.g. :class:`CertHero`)
+      for that host
 
     """
 
     if context is None:
         context = create_ssl_context()
 
-    if num_hosts := len(hostnames):
-        # We can use a with statement to ensure threads are cleaned up promptly
-        with ThreadPoolExecutor(
-            max_workers=min(num_hosts, num_threads)
-        ) as pool:
-            _host_to_cert = {
-                # TODO: Update to remove `or` once we finalize how to handle missing certs
-                host: cert_info or _build_failed_cert('TIMED_OUT')
-                for host, cert_info in zip(
-                    hostnames,
-                    pool.map(
-                        cert_please,
-                        hostnames,
-                        repeat(context),
-                        repeat(user_agent),
-                    ),
-                )
-            }
-    else:
-        _host_to_cert = {}
+    _host_to_cert = {}
+
+    def _track_order(_hostnames):
+        # Reserve a slot for each host as it's submitted, so that the
+        # result is in the same order as `hostnames`, rather than in
+        # the order the hosts complete in.
+        for host in _hostnames:
+            _host_to_cert[host] = None
+            yield host
+
+    for host, cert_info in iter_certs_please(
+        _track_order(_expand_targets(hostnames, ports)), context, num_threads, user_agent,
+        cert_only=cert_only, deadline=deadline, resolver=resolver, cache=cache, **kwargs,
+    ):
+        _host_to_cert[host] = cert_info
 
     return _host_to_cert
+
+
+def iter_certs_please(
+    hostnames: Iterable[str | tuple[str, int]],
+    context: ssl.SSLContext = None,
+    num_threads: int = 25,
+    user_agent: str | None = _DEFAULT_USER_AGENT,
+    max_pending: int | None = None,
+    cert_only: bool = False,
+    deadline: float | None = None,
+    ports: Iterable[int] | None = None,
+    resolver: Resolver | None = None,
+    cache: CertCache | None = None,
+    decode_processes: int | None = None,
+    retry: RetryPolicy | None = None,
+    adaptive: AdaptiveConcurrency | None = None,
+    rate_limit: RateLimit | None = None,
+    journal: SweepJournal | None = None,
+    stats: SweepStats | None = None,
+    **kwargs,
+) -> Iterator[tuple[str | tuple[str, int], CertHero]]:
+    """
+    Retrieve (concurrently) the SSL certificate(s) for a list of ``hostnames``, and
+    yield each ``(hostname, cert)`` pair as soon as that host completes.
+
+    Unlike :func:`certs_please`, results are yielded in *completion* order, so the
+    first result is available as soon as the fastest host responds, and each
+    result can be processed (e.g. stored or alerted on) and then discarded.
+
+    ``hostnames`` can be any iterable - for example, a generator over lines in a file
+    or rows from a DB cursor - and it's consumed lazily: at most ``max_pending`` hosts
+    are in flight (or waiting to be yielded) at any time, so memory usage stays
+    constant no matter how many hosts are scanned.
+
+    A host which fails is yielded with a ``Cert Status`` which says why - ``DNS_NOT_FOUND``,
+    ``DNS_ERROR``, ``TIMED_OUT``, ``CONNECTION_REFUSED``, ``CONNECTION_RESET``, ``HOST_UNREACHABLE``,
+    ``SSL_EOF``, ``SSL_ERROR``, ``INVALID_CERT``, ``INVALID_TARGET`` or ``ERROR`` - along with the time it took to fail,
+    as :attr:`CertHero.elapsed`.
+
+    Usage:
+
+    >>> import cert_hero
+    >>> for host, cert in cert_hero.iter_certs_please(['google.com', 'cnn.com']):
+    ...     print(host, cert['Cert Status'])
+    cnn.com SUCCESS
+    google.com SUCCESS
+
+    >>> with open('hosts.txt') as f:
+    ...     for host, cert in cert_hero.iter_certs_please(line.strip() for line in f):
+    ...         ...
+
+    :param hostnames: List (or any iterable) of hosts to retrieve SSL Certificate(s) for
+    :param context: (Optional) Shared SSL Context
+    :param num_threads: Max number of concurrent threads
+    :param user_agent: A custom *user agent* to use for the HTTP call to retrieve ``Location`` and ``Status``.
+    :param max_pending: Max number of hosts submitted but not yet yielded. Defaults to
+      twice ``num_threads``, so that there is always work queued up for idle threads.
+    :param cert_only: If true, skip the HTTP call to retrieve ``Location`` and ``Status`` (see :func:`cert_please`).
+    :param deadline: Max number of seconds for the entire sweep. Any hosts which are still outstanding
+      at that point - including those not yet consumed from ``hostnames`` - are yielded right away,
+      with a ``Cert Status`` of ``DEADLINE_EXCEEDED``.
+    :param ports: (Optional) Ports to scan for each host in ``hostnames`` which doesn't specify a port
+      of its own. When passed in, each result is keyed by a ``(host, port)`` tuple.
+    :param resolver: (Optional) Shared :class:`Resolver`, to cache DNS lookups (or to use pre-resolved
+      addresses). Defaults to a new :class:`Resolver` for this sweep.
+    :param cache: (Optional) Persistent :class:`CertCache`. Hosts with a fresh entry in the cache are
+      answered from it, without a network round trip, and new results are saved to it.
+    :param decode_processes: (Optional) Number of processes to decode certs in. When passed in, each
+      cert is shipped (as DER bytes) from the I/O threads to a :class:`ProcessPoolExecutor` to be parsed,
+      so that parsing doesn't compete with the I/O threads for the GIL. This helps at high concurrency,
+      as I/O and parsing can then each scale independently.
+    :param retry: (Optional) :class:`RetryPolicy` for hosts which fail with a transient error, such as
+      ``TIMED_OUT``. Retries are scheduled (after a backoff) in between other hosts, and only the final
+      result for each host is yielded.
+    :param adaptive: (Optional) :class:`AdaptiveConcurrency`, to adjust the number of hosts in flight
+      to the capacity of the network - growing it while hosts complete normally, and backing off on
+      timeouts or resets. When passed in, it takes the place of ``num_threads``.
+    :param rate_limit: (Optional) :class:`RateLimit` on the number of new connections per second, and
+      on concurrent connections to each IP address or subnet. A host whose destination is at its cap
+      is set aside - without holding up hosts for other destinations - until that destination frees up.
+    :param journal: (Optional) :class:`SweepJournal` to record each result to, as soon as it completes.
+      Hosts already recorded in it - e.g. by an earlier run which didn't finish - are answered from it,
+      without a network round trip, so that the sweep can be resumed.
+    :param stats: (Optional) :class:`SweepStats` to add each result to. This also records the
+      :attr:`CertHero.timings` of each host, so that aggregate percentiles of each phase are available.
+    :param kwargs: Any additional keyword arguments - such as timeouts - to pass to :func:`cert_please`.
+    :return: An iterator of ``(hostname, cert)`` pairs, in the order that each host completes
+
+    """
+    if stats is not None:
+        # the stats need the timings of each host (even if `timings=False` is passed in)
+        kwargs['timings'] = True
+        for host, cert_info in iter_certs_please(
+            hostnames, context, num_threads, user_agent, max_pending, cert_only, deadline, ports,
+            resolver, cache, decode_processes, retry, adaptive, rate_limit, journal, **kwargs,
+        ):
+            stats.add(cert_info)
+            yield host, cert_info
+        return
+
+    if context is None:
+        context = create_ssl_context()
+
+    if max_pending is None:
+        max_pending = 2 * num_threads
+
+    if resolver is None:
+        resolver = Resolver()
+
+    hostnames = _expand_targets(hostnames, ports)
+    exhausted = False
+    deadline_exceeded = False
+
+    sweep = _Sweep(max_pending, monotonic, deadline, retry, adaptive, rate_limit, journal, cache)
+
+    pool = ThreadPoolExecutor(max_workers=num_threads if adaptive is None else adaptive.maximum)
+
+    decode_pool = None
+    if decode_processes:
+        from concurrent.futures import ProcessPoolExecutor
+        decode_pool = kwargs['decode_pool'] = ProcessPoolExecutor(max_workers=decode_processes)
+
+    def submit(_host, _attempt):
+        _future = pool.submit(
+            _cert_please, _host, context, user_agent, cert_only=cert_only, resolver=resolver,
+            rate_limit=rate_limit, **kwargs,
+        )
+        sweep.add(_future, _host, _attempt)
+
+    try:
+        while True:
+            # Top up the window of in-flight hosts: first with any retries which are due,
+            # or hosts whose destination is no longer at its cap, and then with new hosts
+            for host, attempt in sweep.due():
+                submit(host, attempt)
+
+            while not exhausted and sweep.can_read():
+                if (host := next(hostnames, None)) is None:
+                    exhausted = True
+                    break
+
+                # answer from the journal or the cache, if possible
+                if (cert_info := sweep.lookup(host)) is not None:
+                    yield host, cert_info
+                else:
+                    submit(host, 1)
+
+            if exhausted and sweep.idle():
+                break
+
+            timeout = sweep.timeout()
+            if sweep.pending:
+                done, _ = wait(sweep.pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                sleep(timeout)
+                done = ()
+
+            for future in done:
+                host, cert_info = sweep.complete(future)
+                if cert_info is not None:
+                    yield host, cert_info
+
+            if sweep.past_deadline():
+                deadline_exceeded = True
+                break
+
+        if deadline_exceeded:
+            yield from sweep.abandon()
+            for host in hostnames:
+                yield host, _build_failed_cert('DEADLINE_EXCEEDED')
+
+    finally:
+        # Don't wait on pending hosts if the caller stops iterating early
+        sweep.cancel()
+        # ...and don't block on hosts which are still running past the deadline;
+        # each thread finishes (and is cleaned up) once its own timeouts expire.
+        pool.shutdown(wait=not deadline_exceeded)
+        # The decode pool is always waited on, as parsing a cert doesn't wait on the network;
+        # a `ProcessPoolExecutor` which is still winding down can hang the interpreter at exit.
+        if decode_pool is not None:
+            decode_pool.shutdown()
+
+
+### Offline parsing ###
+
+def cert_from_der(cert_bin: bytes) -> CertHero:
+    """
+    Build a :class:`CertHero` object from the DER-encoded (binary) form of an
+    SSL certificate, which was retrieved by some other means - for example, read from
+    a ``.der`` file. The result has the same schema as for :func:`cert_please`, without
+    the ``Location`` and ``Status`` of a host.
+
+    Usage:
+
+    >>> import cert_hero
+    >>> with open('server.der', 'rb') as f:
+    ...     cert = cert_hero.cert_from_der(f.read())
+
+    """
+    return _build_cert(cert_bin)
+
+
+def cert_from_pem(pem: str | bytes) -> CertHero:
+    """
+    Build a :class:`CertHero` object from the PEM-encoded (text) form of an
+    SSL certificate, such as the contents of a ``.pem`` or ``.crt`` file.
+
+    If ``pem`` is a bundle (e.g. a cert chain), only the first cert is returned;
+    see :func:`certs_from_paths` to parse every cert in a bundle.
+
+    :raises ValueError: If ``pem`` doesn't contain a PEM-encoded cert
+    """
+    if isinstance(pem, str):
+        pem = pem.encode()
+
+    for cert_bin in _iter_der_certs(pem):
+        return _build_cert(cert_bin)
+
+    raise ValueError('No PEM-encoded cert found')
+
+
+def certs_from_paths(
+    paths: Iterable[str | os.PathLike],
+    num_processes: int | None = None,
+    chunk_size: int = 64,
+    max_pending: int | None = None,
+) -> Iterator[tuple[str, CertHero]]:
+    """
+    Parse (in parallel) the SSL certificate(s) in each of the files in ``paths``,
+    and yield a ``(path, cert)`` pair for each cert, with the same schema as for
+    :func:`cert_please`.
+
+    Files can be either PEM-encoded - in which case every cert in a bundle is
+    yielded - or DER-encoded. A directory in ``paths`` is searched (recursively)
+    for files with a ``.pem``, ``.crt``, ``.cer`` or ``.der`` extension.
+
+    Decoding certs is CPU-bound, so files are parsed across a pool of processes,
+    ``chunk_size`` files at a time. ``paths`` is consumed lazily, and results are
+    yielded in the order that each chunk completes.
+
+    A file which can't be read, or which doesn't contain a valid cert, is yielded once
+    with a ``Cert Status`` of ``READ_ERROR`` or ``INVALID_CERT``, respectively.
+
+    Usage:
+
+    >>> import cert_hero
+    >>> for path, cert in cert_hero.certs_from_paths(['/etc/ssl/certs']):
+    ...     print(path, cert.not_after_date)
+
+    :param paths: List (or any iterable) of files or directories to parse SSL Certificate(s) from
+    :param num_processes: Max number of worker processes. Defaults to the number of CPUs.
+    :param chunk_size: Number of files to parse in each task sent to a worker process
+    :param max_pending: Max number of chunks submitted but not yet yielded. Defaults
+      to twice ``num_processes``.
+    :return: An iterator of ``(path, cert)`` pairs
+
+    """
+    if num_processes is None:
+        num_processes = os.cpu_count() or 1
+
+    if max_pending is None:
+        max_pending = 2 * num_processes
+
+    chunks = _chunked(_expand_paths(paths), chunk_size)
+    pending = set()
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=num_processes) as pool:
+        while True:
+            # Top up the window of in-flight chunks
+            for chunk in chunks:
+                pending.add(pool.submit(_parse_cert_files, chunk))
+                if len(pending) >= max_pending:
+                    break
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                yield from future.result()
+
+
+# File extensions to look for, when searching a directory for certs
+_CERT_FILE_EXTENSIONS = ('.pem', '.crt', '.cer', '.der')
+
+
+def _iter_der_certs(data: bytes) -> Iterator[bytes]:
+    """Yield the DER-encoded form of each cert in ``data``, which is PEM- or DER-encoded."""
+    from asn1crypto.pem import detect, unarmor
+
+    if not detect(data):
+        yield data
+        return
+
+    for type_name, _, cert_bin in unarmor(data, multiple=True):
+        if type_name in ('CERTIFICATE', 'X509 CERTIFICATE'):
+            yield cert_bin
+
+
+def _expand_paths(paths: Iterable[str | os.PathLike]) -> Iterator[str]:
+    """Yield each file in ``paths``, searching any directories for cert files."""
+    for path in paths:
+        path = os.fspath(path)
+        if os.path.isdir(path):
+            for dir_path, _, file_names in os.walk(path):
+                for file_name in sorted(file_names):
+                    if file_name.lower().endswith(_CERT_FILE_EXTENSIONS):
+                        yield os.path.join(dir_path, file_name)
+        else:
+            yield path
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Yield successive lists of up to ``size`` items."""
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def _parse_cert_files(paths: list[str]) -> list[tuple[str, CertHero]]:
+    """Parse the cert(s) in each of the files in ``paths`` (in a worker process)."""
+    results = []
+
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            LOG.warning('Unable to read %s: %s', path, e)
+            results.append((path, _build_failed_cert('READ_ERROR')))
+            continue
+
+        num_certs = len(results)
+        try:
+            for cert_bin in _iter_der_certs(data):
+                results.append((path, _build_cert(cert_bin)))
+        except _CERT_PARSE_ERRORS as e:
+            LOG.warning('Invalid cert in %s: %s', path, e)
+            results.append((path, _build_failed_cert('INVALID_CERT')))
+        else:
+            if len(results) == num_certs:
+                results.append((path, _build_failed_cert('INVALID_CERT')))
+
+    return results
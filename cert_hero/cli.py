@@ -1,21 +1,162 @@
 """Console script for cert_hero."""
 import argparse
+import csv
+import json
+import os
 import sys
 
-from . import certs_please, set_expired
+from itertools import chain
 
+from . import iter_certs_please, set_expired
+from .cert_hero import _target_key
 
-def main():
+
+# Columns for the `csv` format, and the path to each in a cert
+CSV_COLUMNS = {
+    'Host': (),
+    'Cert Status': ('Cert Status', ),
+    'Serial': ('Serial', ),
+    'Common Name': ('Subject Name', 'Common Name'),
+    'Issuer': ('Issuer Name', 'Common Name'),
+    'Not Before': ('Validity', 'Not Before'),
+    'Not After': ('Validity', 'Not After'),
+    'Expired': ('Validity', 'Expired'),
+    'Wildcard': ('Wildcard', ),
+    'Signature Algorithm': ('Signature Algorithm', ),
+    'Key Algorithm': ('Key Algorithm', ),
+    'Subject Alt Names': ('Subject Alt Names', ),
+    'Location': ('Location', ),
+    'Status': ('Status', ),
+}
+
+
+def _shard(value):
+    """Parse a ``--shard`` of ``i/K`` (1-based) into a 0-based ``(index, count)`` tuple."""
+    try:
+        i, k = (int(n) for n in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected i/K, such as 1/4: {value!r}') from None
+    if not 1 <= i <= k:
+        raise argparse.ArgumentTypeError(f'expected 1 <= i <= K: {value!r}')
+    return i - 1, k
+
+
+def _read_hosts(f):
+    """Yield each host in the file ``f`` - one per line - skipping blank lines and comments."""
+    for line in f:
+        if (host := line.strip()) and not host.startswith('#'):
+            yield host
+
+
+def _host(target):
+    """Return a ``target`` - which is a ``(host, port)`` tuple, if ``--port`` is passed in - as a string."""
+    return _target_key(target) if isinstance(target, tuple) else target
+
+
+def _write_pretty(results, out):
+    for host, cert in results:
+        out.write(f'=== {_host(host)} ===\n{cert!r}\n\n')
+        out.flush()
+
+
+def _write_jsonl(results, out):
+    for host, cert in results:
+        out.write(json.dumps({'Host': _host(host), **cert}) + '\n')
+        out.flush()
+
+
+def _write_json(results, out):
+    # a mapping of host to cert, the same as `json.dumps(certs_please(...))`,
+    # but written out as each host completes
+    sep = '{\n'
+    for host, cert in results:
+        out.write(f'{sep}  {json.dumps(_host(host))}: {json.dumps(cert)}')
+        out.flush()
+        sep = ',\n'
+    out.write('{}\n' if sep == '{\n' else '\n}\n')
+
+
+def _write_csv(results, out):
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+
+    for host, cert in results:
+        row = [_host(host)]
+        for path in list(CSV_COLUMNS.values())[1:]:
+            value = cert
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            row.append(' '.join(value) if isinstance(value, list) else value)
+        writer.writerow(row)
+        out.flush()
+
+
+WRITERS = {
+    'pretty': _write_pretty,
+    'jsonl': _write_jsonl,
+    'json': _write_json,
+    'csv': _write_csv,
+}
+
+
+def main(argv=None):
     """Console script for cert_hero."""
     parser = argparse.ArgumentParser(prog='ch', description='Retrieve the SSL certificate(s) for one or more given host')
     parser.add_argument('hosts', nargs='*')
-    args = parser.parse_args()
+    parser.add_argument('-i', '--input', type=argparse.FileType('r'), metavar='FILE',
+                        help='read hosts from FILE (or `-` for stdin), one per line')
+    parser.add_argument('-f', '--format', choices=WRITERS, default='pretty',
+                        help='output format - each host is written as soon as it completes (default: pretty)')
+    parser.add_argument('-c', '--concurrency', type=int, default=25,
+                        help='max number of hosts in flight, e.g. threads (default: 25)')
+    parser.add_argument('-t', '--timeout', type=float, default=3,
+                        help='timeout (in seconds) for each step of retrieving a cert (default: 3)')
+    parser.add_argument('-p', '--port', type=int, action='append', dest='ports', metavar='PORT',
+                        help='port(s) to scan, for each host which doesn\'t specify its own (default: 443)')
+    parser.add_argument('--cert-only', action='store_true',
+                        help='only retrieve the certificate, and skip the HTTP call for `Location` and `Status`')
+    parser.add_argument('--shard', type=_shard, metavar='i/K',
+                        help='only scan the hosts in shard i (of K) - e.g. on the i-th of K machines')
+    parser.add_argument('--processes', type=int, metavar='N',
+                        help='split the hosts across N worker processes, each of which writes its results '
+                             'to a file in `--output-dir`; these are written out once all of them are done')
+    parser.add_argument('--output-dir', default='.',
+                        help='directory for the results of each worker process (default: current directory)')
+    args = parser.parse_args(argv)
+
+    hosts = args.hosts
+    if args.input is not None:
+        hosts = chain(hosts, _read_hosts(args.input))
+
+    options = {'cert_only': args.cert_only, 'timeout': args.timeout}
+
+    # only import what's needed, so that `ch` starts up fast
+    if args.processes:
+        from .shard import merge_shards, sharded_certs_please
+
+        paths = sharded_certs_please(hosts, args.processes, args.output_dir, args.shard, args.ports,
+                                     num_threads=args.concurrency, **options)
+        results = merge_shards(paths)
+    elif args.shard is not None:
+        from .shard import in_shard
+
+        # each host:port is in a shard, so the ports are fanned out before sharding
+        hosts = in_shard(hosts, *args.shard, ports=args.ports)
+        results = iter_certs_please(hosts, num_threads=args.concurrency, **options)
+    else:
+        results = iter_certs_please(hosts, num_threads=args.concurrency, ports=args.ports, **options)
 
-    host_to_cert = certs_please(args.hosts)
-    set_expired(host_to_cert)
+    def _set_expired(_results):
+        for host, cert in _results:
+            set_expired([cert])
+            yield host, cert
 
-    for host, cert in host_to_cert.items():
-        print(f'=== {host} ===\n{cert!r}\n')
+    try:
+        WRITERS[args.format](_set_expired(results), sys.stdout)
+    except BrokenPipeError:
+        # the reader (e.g. `head`) has gone away; don't complain about it on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
 
     return 0
 
@@ -0,0 +1,162 @@
+"""Append-only journal of sweep results, so that a sweep can be resumed."""
+from __future__ import annotations
+
+import os
+import threading
+
+from base64 import b64decode, b64encode
+from json import JSONDecodeError, dumps, loads
+from time import monotonic
+from typing import Iterator
+
+from .cert_hero import CertHero, _target_key
+
+
+class SweepJournal:
+    """
+    :class:`SweepJournal` records the result of each host in a sweep, as soon as it
+    completes, to a local `JSON Lines <https://jsonlines.org>`__ file - one line
+    per host, keyed by ``host:port``.
+
+    Pass the same :class:`SweepJournal` to a sweep as ``journal``, and if the process
+    dies part of the way through, running the sweep again picks up where it left off:
+    hosts already recorded are answered from the journal, and only the rest are scanned::
+
+        >>> from cert_hero import SweepJournal, certs_please
+        >>> with SweepJournal('sweep.jsonl') as journal:
+        ...     host_to_cert = certs_please(hosts, journal=journal)
+
+    Each line is flushed to the OS as it's written, so a crash (or a deploy) only loses
+    the hosts still in flight; the file is also ``fsync``-ed at most once every
+    ``sync_interval`` seconds (pass ``None`` to leave it to the OS), to survive a power
+    loss. A line which was only partially written is dropped when the journal is opened.
+
+    Hosts which fail are recorded too, so that they aren't scanned again - except for
+    those abandoned at the ``deadline`` of a sweep, which are left for the next run.
+    """
+
+    def __init__(self,
+                 path: str | os.PathLike = 'cert_hero.jsonl',
+                 sync_interval: float | None = 1.0):
+        self.path = path
+        self.sync_interval = sync_interval
+
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+b')
+        # target -> offset of its (latest) line in the file
+        self._offsets: dict[str, int] = {}
+        self._last_sync = monotonic()
+
+        self._load()
+
+    def _load(self) -> None:
+        """Index the lines in the file, and drop a partially-written last line, if any."""
+        self._file.seek(0)
+        offset = 0
+
+        for line in self._file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                self._offsets[loads(line)['target']] = offset
+            except (JSONDecodeError, KeyError, TypeError, UnicodeDecodeError):
+                pass  # skip over a corrupt line
+            offset += len(line)
+
+        self._file.truncate(offset)
+
+    def get(self, target: str | tuple[str, int]) -> CertHero | None:
+        """
+        Return the recorded cert for ``target`` (``host``, ``host:port``, or ``(host, port)``),
+        or ``None`` if it's not in the journal.
+        """
+        with self._lock:
+            if (offset := self._offsets.get(_target_key(target))) is None:
+                return None
+            return self._read(offset)
+
+    def record(self, target: str | tuple[str, int], cert: CertHero) -> None:
+        """Record the ``cert`` for ``target``."""
+        line = _dumps(key := _target_key(target), cert)
+
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            self._offsets[key] = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+
+            if self.sync_interval is not None and monotonic() - self._last_sync >= self.sync_interval:
+                os.fsync(self._file.fileno())
+                self._last_sync = monotonic()
+
+    def results(self) -> Iterator[tuple[str, CertHero]]:
+        """Yield each ``(host:port, cert)`` pair in the journal, in the order they were recorded."""
+        with self._lock:
+            offsets = sorted(self._offsets.items(), key=lambda item: item[1])
+
+        for target, offset in offsets:
+            with self._lock:
+                cert = self._read(offset)
+            yield target, cert
+
+    def _read(self, offset: int) -> CertHero:
+        self._file.seek(offset)
+        return _loads(self._file.readline())[1]
+
+    def __contains__(self, target: str | tuple[str, int]) -> bool:
+        return _target_key(target) in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def close(self) -> None:
+        """Sync and close the underlying file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _read_journal(path: str | os.PathLike) -> Iterator[tuple[str, CertHero]]:
+    """
+    Yield each ``(host:port, cert)`` pair recorded in the journal at ``path``, in the order
+    they were recorded. Unlike :class:`SweepJournal`, the file is only read, never modified;
+    a partially-written (or corrupt) line is skipped.
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                target, cert = _loads(line)
+            except (ValueError, KeyError, TypeError):  # e.g. a `JSONDecodeError`
+                continue  # skip over a corrupt line
+            yield target, cert
+
+
+def _dumps(key: str, cert: CertHero) -> bytes:
+    """
+    Return the line for the ``cert`` of a target, by its ``key`` - along with the attributes
+    of the cert which aren't part of the ``dict``, so that it's the same once it's read back.
+    """
+    der = None if cert.der is None else b64encode(cert.der).decode()
+    return dumps({'target': key, 'cert': cert, 'elapsed': cert.elapsed, 'der': der}).encode() + b'\n'
+
+
+def _loads(line: bytes) -> tuple[str, CertHero]:
+    """Return the ``(host:port, cert)`` pair for a ``line`` of a journal."""
+    record = loads(line)
+    cert = CertHero.from_dict(record['cert'])
+
+    cert._elapsed = record.get('elapsed')
+    if (der := record.get('der')) is not None:
+        cert._der = b64decode(der)
+
+    return record['target'], cert
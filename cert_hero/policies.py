@@ -0,0 +1,276 @@
+"""Policies which control how a sweep schedules hosts - e.g. retries."""
+from __future__ import annotations
+
+import random
+import threading
+
+from collections import Counter
+from ipaddress import ip_address, ip_network
+from time import monotonic
+from typing import TYPE_CHECKING, Iterable
+
+from .cert_hero import _TRANSIENT_STATUSES
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .cert_hero import CertHero
+
+
+class RetryPolicy:
+    """
+    :class:`RetryPolicy` retries hosts which fail with a *transient* error - such as
+    ``TIMED_OUT`` or ``CONNECTION_RESET`` - in the same sweep, rather than giving up
+    on them right away.
+
+    * Each host is tried up to ``max_attempts`` times in total.
+    * Before each retry, the host waits out an exponential backoff - ``backoff``,
+      then twice that, and so on, up to ``max_backoff`` seconds - with (full) jitter,
+      so that retries to a flaky network don't all land at once.
+    * Only failures with a ``Cert Status`` in ``statuses`` are retried; hosts which
+      don't exist (``DNS_NOT_FOUND``) or refuse the connection are not.
+    * Retries across the entire sweep are capped by a *retry budget*: at most
+      ``budget_min`` retries, plus ``budget_ratio`` retries per host. This stops a
+      widespread outage from doubling (or tripling) the load of a sweep.
+
+    Retries are interleaved with first attempts in the same sweep, so a host waiting
+    out its backoff doesn't hold up any others::
+
+        >>> from cert_hero import RetryPolicy, certs_please
+        >>> host_to_cert = certs_please(['google.com', 'cnn.com'], retry=RetryPolicy(max_attempts=3))
+
+    """
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 backoff: float = 0.5,
+                 max_backoff: float = 10,
+                 jitter: bool = True,
+                 statuses: Iterable[str] = _TRANSIENT_STATUSES,
+                 budget_ratio: float = 0.2,
+                 budget_min: int = 10):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.budget_ratio = budget_ratio
+        self.budget_min = budget_min
+
+    def should_retry(self, cert: CertHero, attempt: int) -> bool:
+        """Return true if a host which failed with ``cert`` on its ``attempt``-th try should be retried."""
+        return attempt < self.max_attempts and cert.get('Cert Status') in self.statuses
+
+    def delay(self, attempt: int) -> float:
+        """Return the time (in seconds) to wait before retrying a host which failed on its ``attempt``-th try."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def budget(self) -> RetryBudget:
+        """Return a new :class:`RetryBudget` for a sweep."""
+        return RetryBudget(self.budget_ratio, self.budget_min)
+
+
+class RetryBudget:
+    """
+    :class:`RetryBudget` caps the number of retries in a sweep at ``minimum``, plus
+    ``ratio`` retries for each host (e.g. first attempt) in the sweep.
+    """
+
+    def __init__(self, ratio: float = 0.2, minimum: int = 10):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.attempts = 0
+        self.retries = 0
+
+    def add_attempt(self) -> None:
+        """Record a first attempt at a host, which adds to the budget."""
+        self.attempts += 1
+
+    def spend(self) -> bool:
+        """Spend a retry, if there is any budget left; return false if there isn't."""
+        if self.retries < self.minimum + self.ratio * self.attempts:
+            self.retries += 1
+            return True
+        return False
+
+
+class AdaptiveConcurrency:
+    """
+    :class:`AdaptiveConcurrency` adjusts the number of hosts in flight in a sweep
+    to the capacity of the network, with AIMD (additive increase, multiplicative
+    decrease) - the same approach as TCP congestion control:
+
+    * While hosts complete without a sign of congestion, the limit grows by
+      ``increase`` for each *window* of hosts - i.e. about ``increase`` per round trip.
+    * When a host fails with a status in ``congestion_statuses`` (e.g. ``TIMED_OUT``
+      or ``CONNECTION_RESET``), or takes longer than ``latency_target`` seconds (if
+      set), the limit is multiplied by ``decrease``. This only happens once for each
+      window of hosts: failures of hosts which started before the last decrease are
+      not counted again.
+
+    The limit always stays between ``minimum`` and ``maximum``.
+
+    Pass an :class:`AdaptiveConcurrency` to a sweep as ``adaptive``, in which case it
+    takes the place of ``num_threads`` (or ``concurrency``)::
+
+        >>> from cert_hero import AdaptiveConcurrency, certs_please
+        >>> host_to_cert = certs_please(hosts, adaptive=AdaptiveConcurrency(initial=25, maximum=500))
+
+    """
+
+    def __init__(self,
+                 initial: int = 25,
+                 minimum: int = 1,
+                 maximum: int = 500,
+                 increase: float = 1,
+                 decrease: float = 0.5,
+                 latency_target: float | None = None,
+                 congestion_statuses: Iterable[str] = ('TIMED_OUT', 'CONNECTION_RESET', 'SSL_EOF')):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.congestion_statuses = frozenset(congestion_statuses)
+
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._last_decrease = float('-inf')
+
+    @property
+    def limit(self) -> int:
+        """The current max number of hosts in flight"""
+        return int(self._limit)
+
+    def record(self, cert: CertHero, now: float | None = None) -> None:
+        """Adjust the limit, based on the result ``cert`` of a host which just completed."""
+        if now is None:
+            now = monotonic()
+
+        elapsed = getattr(cert, 'elapsed', None) or 0.0
+
+        congested = cert.get('Cert Status') in self.congestion_statuses or (
+            self.latency_target is not None and elapsed > self.latency_target
+        )
+
+        if not congested:
+            self._limit = min(self._limit + self.increase / self._limit, self.maximum)
+        # only back off once for each window of hosts in flight
+        elif now - elapsed >= self._last_decrease:
+            self._limit = max(self._limit * self.decrease, self.minimum)
+            self._last_decrease = now
+
+
+class RateLimit:
+    """
+    :class:`RateLimit` limits how hard a sweep hits the network, and any one destination:
+
+    * ``rate`` caps the number of new connections per second, across the entire sweep,
+      with a token bucket which allows bursts of up to ``burst`` connections.
+    * ``per_ip`` caps the number of concurrent connections to each (resolved) IP address.
+    * ``per_subnet`` caps the number of concurrent connections to each subnet - a ``/24``
+      for IPv4, or a ``/64`` for IPv6, by default - e.g. hosts behind the same load balancer.
+
+    A host whose destination is at its cap is set aside, and the sweep keeps working on
+    hosts for other destinations in the meantime; it's retried once a connection to that
+    destination completes. Pass a :class:`RateLimit` to a sweep as ``rate_limit``::
+
+        >>> from cert_hero import RateLimit, certs_please
+        >>> host_to_cert = certs_please(hosts, rate_limit=RateLimit(rate=100, per_ip=2, per_subnet=10))
+
+    A :class:`RateLimit` can be shared between sweeps, and between threads.
+    """
+
+    def __init__(self,
+                 rate: float | None = None,
+                 burst: int | None = None,
+                 per_ip: int | None = None,
+                 per_subnet: int | None = None,
+                 ipv4_prefix: int = 24,
+                 ipv6_prefix: int = 64):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate or 1))
+        self.per_ip = per_ip
+        self.per_subnet = per_subnet
+        self.ipv4_prefix = ipv4_prefix
+        self.ipv6_prefix = ipv6_prefix
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = monotonic()
+        # destination -> number of active connections
+        self._active: Counter[str] = Counter()
+
+    def delay(self) -> float:
+        """Return the time (in seconds) until a new connection is allowed, or ``0`` if it's allowed now."""
+        if self.rate is None:
+            return 0.0
+
+        with self._lock:
+            self._refill()
+            return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        """Take a token from the bucket, for a new connection."""
+        if self.rate is not None:
+            with self._lock:
+                self._refill()
+                self._tokens -= 1
+
+    def refund(self) -> None:
+        """Put a token back in the bucket, for a connection which was never made (e.g. its destination was at its cap)."""
+        if self.rate is not None:
+            with self._lock:
+                self._refill()
+                self._tokens = min(self.burst, self._tokens + 1)
+
+    def acquire(self, ip: str) -> str | None:
+        """
+        Acquire a connection slot for the IP address ``ip``.
+
+        :return: ``None`` if the slot was acquired, else the destination (IP address
+          or subnet) which is at its cap
+        """
+        destinations = self._destinations(ip)
+
+        with self._lock:
+            for destination in destinations:
+                if not self._has_slot(destination):
+                    return destination
+            for destination in destinations:
+                self._active[destination] += 1
+
+        return None
+
+    def release(self, ip: str) -> None:
+        """Release a connection slot for the IP address ``ip``."""
+        with self._lock:
+            for destination in self._destinations(ip):
+                self._active[destination] -= 1
+                if self._active[destination] <= 0:
+                    del self._active[destination]
+
+    def available(self, destination: str) -> bool:
+        """Return true if ``destination`` (as returned by :meth:`acquire`) has a free slot."""
+        with self._lock:
+            return self._has_slot(destination)
+
+    def _has_slot(self, destination: str) -> bool:
+        cap = self.per_subnet if '/' in destination else self.per_ip
+        return cap is None or self._active[destination] < cap
+
+    def _destinations(self, ip: str) -> list[str]:
+        destinations = []
+
+        if self.per_ip is not None:
+            destinations.append(ip)
+
+        if self.per_subnet is not None:
+            address = ip_address(ip.split('%', 1)[0])
+            prefix = self.ipv4_prefix if address.version == 4 else self.ipv6_prefix
+            destinations.append(str(ip_network(f'{address}/{prefix}', strict=False)))
+
+        return destinations
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
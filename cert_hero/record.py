@@ -0,0 +1,249 @@
+"""Compact, memory-efficient record of a cert - for large inventories."""
+from __future__ import annotations
+
+from datetime import date
+from json import dumps
+from sys import intern
+
+from .cert_hero import CertHero
+
+
+# Shared (interned) tuples, such as the keys of a name, or an entire issuer name
+_TUPLES: dict[tuple, tuple] = {}
+
+
+class CertRecord:
+    """
+    :class:`CertRecord` is a compact form of a :class:`CertHero`, meant for keeping
+    a large number (e.g. hundreds of thousands) of certs in memory at once.
+
+    Compared to a :class:`CertHero`, which is a :class:`dict` of nested dicts:
+
+    * Fields are stored in ``__slots__``, so there is no per-instance ``__dict__``,
+      and no (repeated) keys such as ``"Subject Name"`` or ``"Validity"``.
+    * The *Subject Name* and *Issuer Name* are stored as flat tuples. Their keys,
+      and the entire *Issuer Name*, are shared between records, as are the algorithms.
+    * The *Not After* and *Not Before* dates are stored as (integer) ordinals.
+
+    A :class:`CertRecord` converts losslessly to and from a :class:`CertHero`, or its
+    serialized (JSON) form::
+
+        >>> from cert_hero import CertRecord, cert_please
+        >>> record = CertRecord.from_dict(cert_please('google.com'))
+        >>> record.not_after_date
+        datetime.date(2023, 10, 28)
+        >>> cert = record.to_cert_hero()
+
+    The DER-encoded (binary) cert is only kept if ``keep_der`` is passed in.
+    """
+    __slots__ = (
+        'status',
+        'serial',
+        'subject',
+        'issuer',
+        'not_after',
+        'not_before',
+        'expired',
+        'wildcard',
+        'sig_algo',
+        'key_algo',
+        'sans',
+        'location',
+        'status_code',
+        'extra',
+        'der',
+    )
+
+    def __init__(self, status: str,
+                 serial: str | int | None = None,
+                 subject: tuple | None = None,
+                 issuer: tuple | None = None,
+                 not_after: int | None = None,
+                 not_before: int | None = None,
+                 expired: bool | None = None,
+                 wildcard: bool | None = None,
+                 sig_algo: str | None = None,
+                 key_algo: str | None = None,
+                 sans: tuple[str, ...] | None = None,
+                 location: str | None = None,
+                 status_code: int | None = None,
+                 extra: dict | None = None,
+                 der: bytes | None = None):
+        self.status = intern(status)
+        self.serial = serial
+        self.subject = subject
+        self.issuer = issuer
+        self.not_after = not_after
+        self.not_before = not_before
+        self.expired = expired
+        self.wildcard = wildcard
+        self.sig_algo = sig_algo
+        self.key_algo = key_algo
+        self.sans = sans
+        self.location = location
+        self.status_code = status_code
+        self.extra = extra
+        self.der = der
+
+    @classmethod
+    def from_dict(cls, o: dict, keep_der: bool = False) -> CertRecord:
+        """
+        Convert a :class:`CertHero`, or its serialized (``dict``) form, to a
+        :class:`CertRecord` object.
+        """
+        cert, o = o, dict(o)
+        record = cls(o.pop('Cert Status'))
+
+        if 'Serial' in o:
+            record.serial = _pack_serial(o.pop('Serial'))
+
+        if isinstance(o.get('Subject Name'), dict):
+            record.subject = _pack_name(o.pop('Subject Name'))
+
+        if isinstance(o.get('Issuer Name'), dict):
+            record.issuer = _intern_tuple(_pack_name(o.pop('Issuer Name')))
+
+        validity = o.get('Validity')
+        if isinstance(validity, dict) and validity.keys() <= {'Not After', 'Not Before', 'Expired'} \
+                and 'Not After' in validity and 'Not Before' in validity:
+            record.not_after = date.fromisoformat(validity['Not After']).toordinal()
+            record.not_before = date.fromisoformat(validity['Not Before']).toordinal()
+            record.expired = validity.get('Expired')
+            del o['Validity']
+
+        if 'Wildcard' in o:
+            record.wildcard = o.pop('Wildcard')
+
+        if isinstance(o.get('Signature Algorithm'), str):
+            record.sig_algo = intern(o.pop('Signature Algorithm'))
+
+        if isinstance(o.get('Key Algorithm'), str):
+            record.key_algo = intern(o.pop('Key Algorithm'))
+
+        if isinstance(o.get('Subject Alt Names'), list):
+            record.sans = tuple(o.pop('Subject Alt Names'))
+
+        if 'Location' in o:
+            record.location = o.pop('Location')
+
+        if 'Status' in o:
+            record.status_code = o.pop('Status')
+
+        # anything else is kept as-is
+        if o:
+            record.extra = o
+
+        if keep_der:
+            record.der = getattr(cert, 'der', None)
+
+        return record
+
+    def to_dict(self) -> dict:
+        """Return the serialized (``dict``) form of the cert, the same as for a :class:`CertHero`."""
+        o = {'Cert Status': self.status}
+
+        if (serial := self.serial) is not None:
+            o['Serial'] = format(serial, 'X') if isinstance(serial, int) else serial
+
+        if self.subject is not None:
+            o['Subject Name'] = _unpack_name(self.subject)
+
+        if self.issuer is not None:
+            o['Issuer Name'] = _unpack_name(self.issuer)
+
+        if self.not_after is not None:
+            validity = o['Validity'] = {
+                'Not After': date.fromordinal(self.not_after).isoformat(),
+                'Not Before': date.fromordinal(self.not_before).isoformat(),
+            }
+            if self.expired is not None:
+                validity['Expired'] = self.expired
+
+        if self.wildcard is not None:
+            o['Wildcard'] = self.wildcard
+
+        if self.sig_algo is not None:
+            o['Signature Algorithm'] = self.sig_algo
+
+        if self.key_algo is not None:
+            o['Key Algorithm'] = self.key_algo
+
+        if self.sans is not None:
+            o['Subject Alt Names'] = list(self.sans)
+
+        if self.location is not None:
+            o['Location'] = self.location
+
+        if self.status_code is not None:
+            o['Status'] = self.status_code
+
+        if self.extra:
+            o.update(self.extra)
+
+        return o
+
+    def to_cert_hero(self) -> CertHero:
+        """Convert to a :class:`CertHero` object."""
+        cert = CertHero(self.to_dict())
+        cert._not_after_date = self.not_after_date
+        cert._not_before_date = self.not_before_date
+        cert._der = self.der
+        return cert
+
+    @property
+    def not_after_date(self) -> date:
+        """The Cert *Not After* Date (e.g. Valid Until)"""
+        return date.min if self.not_after is None else date.fromordinal(self.not_after)
+
+    @property
+    def not_before_date(self) -> date:
+        """The Cert *Not Before* Date (e.g. Valid From)"""
+        return date.min if self.not_before is None else date.fromordinal(self.not_before)
+
+    def __eq__(self, other):
+        if not isinstance(other, CertRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.to_dict()!r})'
+
+    def __str__(self):
+        return dumps(self.to_dict())
+
+
+def _intern_tuple(t: tuple) -> tuple:
+    """Return a shared copy of the tuple ``t``."""
+    try:
+        return _TUPLES.setdefault(t, t)
+    except TypeError:  # unhashable
+        return t
+
+
+def _pack_serial(serial: str) -> str | int:
+    """Return the (hex) serial number as an ``int``, if it converts back to the same string."""
+    try:
+        if format(number := int(serial, 16), 'X') == serial:
+            return number
+    except (TypeError, ValueError):
+        pass
+    return serial
+
+
+def _pack_name(name: dict) -> tuple:
+    """
+    Pack a name (e.g. *Subject Name*) into a flat tuple of the (shared) keys,
+    followed by the values.
+    """
+    keys = _intern_tuple(tuple(intern(k) for k in name))
+    values = (intern(v) if isinstance(v, str) else tuple(v) if isinstance(v, list) else v
+              for v in name.values())
+    return keys, *values
+
+
+def _unpack_name(packed: tuple) -> dict:
+    """Unpack a name packed with :func:`_pack_name`."""
+    keys, *values = packed
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in zip(keys, values)}
@@ -0,0 +1,216 @@
+"""DNS resolution, with an in-process cache."""
+from __future__ import annotations
+
+import socket
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from ipaddress import IPv4Address, IPv6Address, ip_address
+from time import monotonic
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+
+
+# `gaierror` codes which mean the name doesn't exist (e.g. NXDOMAIN), as opposed
+# to a transient failure such as `EAI_AGAIN`; only these are cached.
+_NEGATIVE_CACHE_ERRORS = frozenset(
+    getattr(socket, name) for name in ('EAI_NONAME', 'EAI_NODATA') if hasattr(socket, name)
+)
+
+
+class Resolver:
+    """
+    :class:`Resolver` resolves hostnames to the addresses to connect to, and caches
+    the results in-process, so that a sweep with many repeated (or related) names
+    only looks up each name once.
+
+    * Addresses are cached for ``ttl`` seconds. Note that :func:`socket.getaddrinfo` does
+      not expose the TTL of the DNS record itself, so this is a fixed upper bound.
+    * Names which don't exist (e.g. ``NXDOMAIN``) are cached for ``negative_ttl`` seconds,
+      so that they fail right away - before any socket is opened.
+    * Concurrent lookups of the same name share a single call to :func:`socket.getaddrinfo`,
+      and at most ``max_concurrency`` lookups run at once.
+    * Pre-resolved IP addresses can be passed in via ``addresses``, for example from an
+      inventory; those hosts are never looked up. Note that the SNI (server name) is still
+      set to the hostname when connecting.
+
+    A :class:`Resolver` can be shared between sweeps, and between threads::
+
+        >>> from cert_hero import Resolver, certs_please
+        >>> resolver = Resolver(addresses={'internal.example.com': ['10.0.0.7']})
+        >>> host_to_cert = certs_please(['internal.example.com', 'google.com'], resolver=resolver)
+
+    """
+
+    def __init__(self,
+                 ttl: float = 300,
+                 negative_ttl: float = 60,
+                 max_concurrency: int = 32,
+                 max_size: int = 100_000,
+                 addresses: dict[str, Iterable[str]] | None = None):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_concurrency = max_concurrency
+        self.max_size = max_size
+
+        # host -> (expires at, `getaddrinfo()` results or `gaierror`)
+        self._cache: dict[str, tuple[float, list[tuple] | socket.gaierror]] = {}
+        # host -> `getaddrinfo()` results, which never expire
+        self._pinned: dict[str, list[tuple]] = {}
+
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight: dict[str, Future] = {}
+        self._async_in_flight: dict[str, asyncio.Future] = {}
+
+        if addresses:
+            for host, ip_addresses in addresses.items():
+                self.add(host, ip_addresses)
+
+    def add(self, host: str, ip_addresses: Iterable[str]) -> None:
+        """Pin ``host`` to pre-resolved ``ip_addresses`` (IPv4 or IPv6)."""
+        self._pinned[host] = [_addr_info(ip_address(ip)) for ip in ip_addresses]
+
+    def clear(self) -> None:
+        """Clear the cache (pre-resolved addresses are kept)."""
+        self._cache.clear()
+
+    def resolve(self, host: str, port: int = 443) -> list[tuple]:
+        """
+        Resolve ``host`` - from the cache, if possible.
+
+        :return: A list of 5-tuples, as returned by :func:`socket.getaddrinfo`
+        :raises socket.gaierror: If the host could not be resolved
+        """
+        if (addr_infos := self._lookup(host)) is None:
+            with self._lock:
+                future = self._in_flight.get(host)
+                if owner := future is None:
+                    future = self._in_flight[host] = Future()
+
+            if owner:
+                try:
+                    with self._semaphore:
+                        addr_infos = self._getaddrinfo(host)
+                except BaseException as e:
+                    future.set_exception(e)
+                    raise
+                else:
+                    future.set_result(addr_infos)
+                finally:
+                    with self._lock:
+                        del self._in_flight[host]
+            else:
+                # wait on the same lookup, from another thread
+                addr_infos = future.result()
+
+        return _with_port(addr_infos, port)
+
+    async def async_resolve(self, host: str, port: int = 443) -> list[tuple]:
+        """
+        Resolve ``host`` - from the cache, if possible - without blocking the event loop.
+
+        Lookups run in the loop's default executor, which bounds their concurrency.
+
+        :return: A list of 5-tuples, as returned by :func:`socket.getaddrinfo`
+        :raises socket.gaierror: If the host could not be resolved
+        """
+        # imported here, so that `asyncio` isn't imported unless it's used (in which case it's already loaded)
+        import asyncio
+
+        if (addr_infos := self._lookup(host)) is None:
+            if (future := self._async_in_flight.get(host)) is None:
+                loop = asyncio.get_running_loop()
+                future = self._async_in_flight[host] = loop.create_future()
+                try:
+                    addr_infos = await loop.run_in_executor(None, self._getaddrinfo, host)
+                except BaseException as e:
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+                        # mark as retrieved, in case nobody else is waiting on it
+                        future.exception()
+                    raise
+                else:
+                    future.set_result(addr_infos)
+                finally:
+                    del self._async_in_flight[host]
+            else:
+                # wait on the same lookup, from another task
+                addr_infos = await asyncio.shield(future)
+
+        return _with_port(addr_infos, port)
+
+    def resolve_many(self, hosts: Iterable[str],
+                     port: int = 443) -> dict[str, list[tuple] | Exception]:
+        """
+        Resolve (concurrently) a batch of ``hosts``, for example to warm up the cache
+        before a sweep.
+
+        :return: A mapping of each host to either a list of addresses (as returned
+          by :func:`socket.getaddrinfo`), or the error from resolving it
+        """
+        def _resolve(_host):
+            try:
+                return self.resolve(_host, port)
+            except OSError as e:
+                return e
+
+        hosts = list(dict.fromkeys(hosts))
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            return dict(zip(hosts, pool.map(_resolve, hosts)))
+
+    def _lookup(self, host: str) -> list[tuple] | None:
+        """Return the cached addresses for ``host``, or ``None`` on a cache miss."""
+        if (addr_infos := self._pinned.get(host)) is not None:
+            return addr_infos
+
+        if (entry := self._cache.get(host)) is not None:
+            expires_at, result = entry
+            if monotonic() < expires_at:
+                if isinstance(result, socket.gaierror):
+                    raise socket.gaierror(*result.args)
+                return result
+            self._cache.pop(host, None)
+
+        return None
+
+    def _getaddrinfo(self, host: str) -> list[tuple]:
+        """Resolve ``host`` with :func:`socket.getaddrinfo`, and cache the result."""
+        try:
+            addr_infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno in _NEGATIVE_CACHE_ERRORS:
+                self._store(host, e, self.negative_ttl)
+            raise
+        else:
+            self._store(host, addr_infos, self.ttl)
+            return addr_infos
+
+    def _store(self, host: str, result: list[tuple] | socket.gaierror, ttl: float) -> None:
+        if len(self._cache) >= self.max_size:
+            # evict the oldest entry
+            try:
+                del self._cache[next(iter(self._cache))]
+            except (StopIteration, KeyError, RuntimeError):
+                pass
+        self._cache[host] = (monotonic() + ttl, result)
+
+
+def _addr_info(ip: IPv4Address | IPv6Address) -> tuple:
+    """Build the :func:`socket.getaddrinfo` result for an IP address."""
+    if ip.version == 6:
+        return socket.AF_INET6, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (str(ip), 0, 0, 0)
+    return socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (str(ip), 0)
+
+
+def _with_port(addr_infos: list[tuple], port: int) -> list[tuple]:
+    """Return a copy of ``addr_infos`` (from :func:`socket.getaddrinfo`) with the port set to ``port``."""
+    return [
+        (family, sock_type, proto, canon_name, (sock_addr[0], port, *sock_addr[2:]))
+        for family, sock_type, proto, canon_name, sock_addr in addr_infos
+    ]
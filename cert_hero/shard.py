@@ -0,0 +1,183 @@
+"""Sharded sweeps, across multiple processes (or machines)."""
+from __future__ import annotations
+
+import multiprocessing
+import os
+
+from hashlib import blake2b
+from pathlib import Path
+from queue import Full
+from typing import Iterable, Iterator
+
+from .cert_hero import CertHero, _expand_targets, _target_key, iter_certs_please
+from .journal import SweepJournal, _read_journal
+
+
+# Max number of batches of targets queued up for each worker process
+_MAX_QUEUED_BATCHES = 16
+
+
+def shard_of(target: str | tuple[str, int], num_shards: int) -> int:
+    """
+    Return the shard (``0 <= shard < num_shards``) for ``target``, by a stable hash
+    of its ``host:port`` - the same in every process, and on every machine.
+    """
+    return _hash(target) % num_shards
+
+
+def in_shard(hostnames: Iterable[str | tuple[str, int]],
+             index: int,
+             num_shards: int,
+             ports: Iterable[int] | None = None) -> Iterator[str | tuple[str, int]]:
+    """
+    Yield only the targets in ``hostnames`` which are in shard ``index`` (of ``num_shards``).
+
+    If ``ports`` are passed in, each host is fanned out across them first (as a ``(host, port)``
+    tuple), so that each ``host:port`` is assigned to a shard - as with :func:`sharded_certs_please`.
+    """
+    for target in _expand_targets(hostnames, ports):
+        if _hash(target) % num_shards == index:
+            yield target
+
+
+def sharded_certs_please(
+    hostnames: Iterable[str | tuple[str, int]],
+    processes: int | None = None,
+    directory: str | os.PathLike = '.',
+    shard: tuple[int, int] | None = None,
+    ports: Iterable[int] | None = None,
+    batch_size: int = 256,
+    **kwargs,
+) -> list[Path]:
+    """
+    Retrieve the SSL certificate(s) for a list of ``hostnames``, split across ``processes``
+    worker processes - each with its own GIL, and its own :func:`iter_certs_please` sweep -
+    so that throughput scales with the number of cores.
+
+    Each target is assigned to a worker by a stable hash of its ``host:port`` (see
+    :func:`shard_of`), and each worker records its results to its own :class:`SweepJournal`
+    in ``directory``. Combine them with :func:`merge_shards` once the sweep is done; as
+    they are journals, running the same sweep again (with the same number of ``processes``)
+    resumes where it left off.
+
+    To scale out across machines, pass the same ``hostnames`` to each machine along
+    with its ``shard`` - a ``(index, count)`` tuple, such as ``(0, 4)`` for the first
+    of four machines - and each one only scans the targets in its own shard.
+
+    Usage:
+
+    >>> import cert_hero
+    >>> with open('hosts.txt') as f:
+    ...     paths = cert_hero.sharded_certs_please((line.strip() for line in f), processes=8, directory='out')
+    >>> for host, cert in cert_hero.merge_shards(paths):
+    ...     print(host, cert['Cert Status'])
+
+    :param hostnames: List (or any iterable) of hosts to retrieve SSL Certificate(s) for
+    :param processes: Number of worker processes. Defaults to the number of CPUs.
+    :param directory: Directory to write each worker's results to, as ``shard-{index}-{worker}.jsonl``
+    :param shard: (Optional) ``(index, count)`` of the shard to scan, out of the ``hostnames`` on all machines
+    :param ports: (Optional) Ports to scan for each host in ``hostnames`` which doesn't specify a port
+      of its own (see :func:`iter_certs_please`).
+    :param batch_size: Number of targets to send to a worker process at a time
+    :param kwargs: Any additional keyword arguments to pass to :func:`iter_certs_please` in each worker,
+      such as ``num_threads`` or ``timeout``. These need to be picklable - an SSL ``context`` isn't, so
+      each worker creates its own - and any stateful objects, such as ``stats``, are local to each worker.
+    :return: The paths to the results (journal) of each worker
+
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    index, count = (0, 1) if shard is None else shard
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = [directory / f'shard-{index}-{worker}.jsonl' for worker in range(processes)]
+
+    queues = [multiprocessing.Queue(_MAX_QUEUED_BATCHES) for _ in range(processes)]
+    # not daemonic, as a daemonic process can't have children of its own - such as the pool
+    # for `decode_processes`; each worker is joined (or terminated) before returning instead.
+    workers = [
+        multiprocessing.Process(target=_scan_shard, args=(queue, path, kwargs))
+        for queue, path in zip(queues, paths)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        # Route each target in this shard to a worker. The hash is divided by `count`
+        # first, as the remainder is the same for every target in this shard.
+        batches = [[] for _ in range(processes)]
+
+        for target in _expand_targets(hostnames, ports):
+            h, shard_index = divmod(_hash(target), count)
+            if shard_index != index:
+                continue
+            worker = h % processes
+            batch = batches[worker]
+            batch.append(target)
+            if len(batch) >= batch_size:
+                _put(queues[worker], workers[worker], batch)
+                batches[worker] = []
+
+        for worker, batch in enumerate(batches):
+            if batch:
+                _put(queues[worker], workers[worker], batch)
+            _put(queues[worker], workers[worker], None)
+
+        for worker in workers:
+            worker.join()
+
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    if failed := [str(path) for path, worker in zip(paths, workers) if worker.exitcode]:
+        raise RuntimeError(f'Worker process(es) failed to complete: {", ".join(failed)}')
+
+    return paths
+
+
+def merge_shards(paths: Iterable[str | os.PathLike]) -> Iterator[tuple[str, CertHero]]:
+    """
+    Yield each ``(host:port, cert)`` pair in the results of a sharded sweep - see
+    :func:`sharded_certs_please`. A directory in ``paths`` is searched for the
+    ``shard-*.jsonl`` files in it.
+
+    Results are streamed from each file in turn, as each target is in only one of them
+    (for the same number of ``processes``), so memory usage stays constant. The files
+    are only read, and never modified; a line which is only partially written - e.g. by
+    a worker which died - is skipped.
+    """
+    for path in paths:
+        path = Path(path)
+        for shard_path in sorted(path.glob('shard-*.jsonl')) if path.is_dir() else (path, ):
+            yield from _read_journal(shard_path)
+
+
+def _hash(target: str | tuple[str, int]) -> int:
+    return int.from_bytes(blake2b(_target_key(target).encode(), digest_size=8).digest(), 'big')
+
+
+def _put(queue: multiprocessing.Queue, worker: multiprocessing.Process, batch: list | None) -> None:
+    """Put a ``batch`` on a worker's ``queue``, unless the worker has died."""
+    while True:
+        try:
+            queue.put(batch, timeout=1)
+            return
+        except Full:
+            if not worker.is_alive():
+                raise RuntimeError(f'Worker process exited early, with code {worker.exitcode}') from None
+
+
+def _scan_shard(queue: multiprocessing.Queue, path: Path, kwargs: dict) -> None:
+    """Run a sweep of the targets (sent in batches) on ``queue``, in a worker process."""
+
+    def _targets():
+        while (batch := queue.get()) is not None:
+            yield from batch
+
+    with SweepJournal(path) as journal:
+        for _ in iter_certs_please(_targets(), journal=journal, **kwargs):
+            pass
@@ -0,0 +1,114 @@
+"""Timing instrumentation, and aggregate stats for a sweep."""
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .cert_hero import CertHero
+
+
+# Phases of retrieving a cert, in order
+PHASES = ('dns', 'connect', 'handshake', 'http', 'parse', 'total')
+
+
+class SweepStats:
+    """
+    :class:`SweepStats` collects the per-phase timings (see :attr:`CertHero.timings`)
+    of each host in a sweep, along with counts of each ``Cert Status``, TLS version
+    and cipher, so that slow phases - e.g. DNS, or the TLS handshake - can be found.
+
+    Pass a :class:`SweepStats` to a sweep as ``stats``, which also turns on the
+    ``timings`` for each host::
+
+        >>> from cert_hero import SweepStats, certs_please
+        >>> stats = SweepStats()
+        >>> host_to_cert = certs_please(['google.com', 'cnn.com'], stats=stats)
+        >>> stats.summary()['handshake']
+        {'count': 2, 'mean': 0.041, 'p50': 0.038, 'p90': 0.044, 'p99': 0.045, 'max': 0.045}
+
+    """
+
+    def __init__(self):
+        self.durations: dict[str, array] = {phase: array('d') for phase in PHASES}
+        self.statuses: Counter[str] = Counter()
+        self.tls_versions: Counter[str] = Counter()
+        self.ciphers: Counter[str] = Counter()
+
+    def add(self, cert: CertHero) -> None:
+        """Add the result for a host to the stats."""
+        self.statuses[cert.get('Cert Status')] += 1
+
+        if timings := getattr(cert, 'timings', None):
+            for phase, seconds in timings.items():
+                self.durations.setdefault(phase, array('d')).append(seconds)
+
+        if tls_version := getattr(cert, 'tls_version', None):
+            self.tls_versions[tls_version] += 1
+
+        if cipher := getattr(cert, 'cipher', None):
+            self.ciphers[cipher] += 1
+
+    def percentile(self, phase: str, q: float) -> float | None:
+        """
+        Return the ``q``-th percentile (``0 <= q <= 100``) of the durations (in seconds)
+        for ``phase``, or ``None`` if there are none.
+        """
+        return _percentile(sorted(self.durations.get(phase, ())), q)
+
+    def summary(self, percentiles: tuple[float, ...] = (50, 90, 99)) -> dict[str, dict[str, float]]:
+        """
+        Return a summary of the durations (in seconds) of each phase: the count, mean,
+        ``percentiles``, and max.
+        """
+        summary = {}
+
+        for phase, durations in self.durations.items():
+            if not durations:
+                continue
+
+            values = sorted(durations)
+            phase_summary = summary[phase] = {'count': len(values), 'mean': sum(values) / len(values)}
+            for q in percentiles:
+                phase_summary[f'p{q:g}'] = _percentile(values, q)
+            phase_summary['max'] = values[-1]
+
+        return summary
+
+
+class _Stopwatch:
+    """Record the time (in seconds) spent in each phase of retrieving a cert."""
+    __slots__ = ('phases', '_start', '_last')
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self._start = self._last = monotonic()
+
+    def lap(self, phase: str) -> None:
+        """End the current phase, and start the next one."""
+        now = monotonic()
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    def elapsed(self) -> float:
+        """Return the time (in seconds) since the stopwatch was started."""
+        return monotonic() - self._start
+
+    def stop(self) -> dict[str, float]:
+        """Stop the stopwatch, and return the duration of each phase (and the ``total``)."""
+        self.phases['total'] = monotonic() - self._start
+        return self.phases
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    """Return the ``q``-th percentile of (sorted) ``values``, with linear interpolation."""
+    if not values:
+        return None
+
+    pos = (len(values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
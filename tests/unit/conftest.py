@@ -0,0 +1,100 @@
+import pathlib
+import socket
+import ssl
+import threading
+
+import pytest
+
+
+DATA_DIR = pathlib.Path(__file__).parent / 'data'
+
+HTTP_RESPONSE = (
+    b'HTTP/1.0 301 Moved Permanently\r\n'
+    b'Location: https://cert-hero.test/\r\n'
+    b'\r\n'
+)
+
+
+class TLSServer:
+    """
+    A (threaded) local TLS server which serves :func:`cert_pem_file`, and
+    responds to any HTTP request with a redirect.
+    """
+
+    def __init__(self, cert_file, key_file, host='127.0.0.1', response=HTTP_RESPONSE):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(cert_file, key_file)
+        self.response = response
+
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        self.sock = socket.create_server((host, 0), family=family)
+        self.host, self.port = self.sock.getsockname()[:2]
+        self.num_requests = 0
+
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:  # closed
+                return
+            threading.Thread(target=self._handle, args=(conn, ), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            with self.context.wrap_socket(conn, server_side=True) as tls_conn:
+                data = b''
+                while b'\r\n\r\n' not in data:
+                    if not (chunk := tls_conn.recv(1024)):
+                        return
+                    data += chunk
+                self.num_requests += 1
+                tls_conn.sendall(self.response)
+        except OSError:
+            pass
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture(scope='session')
+def cert_pem_file() -> pathlib.Path:
+    """Path to a (self-signed) PEM-encoded certificate for ``*.cert-hero.test``."""
+    return DATA_DIR / 'cert.pem'
+
+
+@pytest.fixture(scope='session')
+def key_pem_file() -> pathlib.Path:
+    """Path to the private key for :func:`cert_pem_file`."""
+    return DATA_DIR / 'key.pem'
+
+
+@pytest.fixture(scope='session')
+def cert_der(cert_pem_file) -> bytes:
+    """The DER-encoded (binary) form of :func:`cert_pem_file`."""
+    return ssl.PEM_cert_to_DER_cert(cert_pem_file.read_text())
+
+
+@pytest.fixture
+def tls_server(cert_pem_file, key_pem_file):
+    """A local :class:`TLSServer`, listening on a random port."""
+    server = TLSServer(cert_pem_file, key_pem_file)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def tls_server_v6(cert_pem_file, key_pem_file):
+    """A local :class:`TLSServer`, listening on a random port on ``::1``."""
+    server = TLSServer(cert_pem_file, key_pem_file, host='::1')
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def closed_port() -> int:
+    """A local port which nothing is listening on."""
+    with socket.create_server(('127.0.0.1', 0)) as sock:
+        return sock.getsockname()[1]
@@ -0,0 +1,145 @@
+import asyncio
+import socket
+
+from cert_hero import aio
+
+
+def test_async_certs_please_bounds_concurrency(monkeypatch):
+    in_flight = max_in_flight = 0
+
+    async def fake_cert_please(hostname, *args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return aio.CertHero({'Cert Status': 'CONNECTION_REFUSED' if hostname == 'bad.test' else 'SUCCESS'})
+
+    monkeypatch.setattr(aio, '_async_cert_please', fake_cert_please)
+
+    hosts = [f'host-{i}.test' for i in range(20)] + ['bad.test']
+    host_to_cert = asyncio.run(aio.async_certs_please(hosts, concurrency=5))
+
+    assert list(host_to_cert) == hosts
+    assert max_in_flight == 5
+    assert host_to_cert['host-0.test']['Cert Status'] == 'SUCCESS'
+    assert host_to_cert['bad.test']['Cert Status'] == 'CONNECTION_REFUSED'
+
+
+def test_async_iter_certs_please_consumes_hostnames_lazily(monkeypatch):
+    consumed = 0
+
+    async def fake_cert_please(hostname, *args, **kwargs):
+        await asyncio.sleep(0)
+        return aio.CertHero({'Cert Status': 'SUCCESS'})
+
+    def hostnames():
+        nonlocal consumed
+        for i in range(1000):
+            consumed += 1
+            yield f'host-{i}.test'
+
+    monkeypatch.setattr(aio, '_async_cert_please', fake_cert_please)
+
+    async def first_result():
+        async for host, cert in aio.async_iter_certs_please(hostnames(), concurrency=10):
+            return host, cert
+
+    host, cert = asyncio.run(first_result())
+
+    assert cert['Cert Status'] == 'SUCCESS'
+    assert consumed == 10
+
+
+def test_async_certs_please_deadline(monkeypatch):
+    async def fake_cert_please(hostname, *args, **kwargs):
+        await asyncio.sleep(0.01 if hostname == 'fast.test' else 10)
+        return aio.CertHero({'Cert Status': 'SUCCESS'})
+
+    monkeypatch.setattr(aio, '_async_cert_please', fake_cert_please)
+
+    host_to_cert = asyncio.run(aio.async_certs_please(
+        ['fast.test', 'slow.test', 'never-started.test'], concurrency=2, deadline=0.1))
+
+    assert {host: cert['Cert Status'] for host, cert in host_to_cert.items()} == {
+        'fast.test': 'SUCCESS',
+        'slow.test': 'DEADLINE_EXCEEDED',
+        'never-started.test': 'DEADLINE_EXCEEDED',
+    }
+
+
+def test_async_cert_please_with_host_and_port(tls_server):
+    cert = asyncio.run(aio.async_cert_please(f'127.0.0.1:{tls_server.port}'))
+
+    assert cert['Cert Status'] == 'SUCCESS'
+    assert cert['Subject Name']['Common Name'] == '*.cert-hero.test'
+    assert cert['Status'] == 301
+
+
+def test_async_certs_please_with_ports(tls_server, closed_port):
+    host_to_cert = asyncio.run(aio.async_certs_please(
+        ['127.0.0.1'], ports=[tls_server.port, closed_port], cert_only=True))
+
+    assert list(host_to_cert) == [('127.0.0.1', tls_server.port), ('127.0.0.1', closed_port)]
+    assert host_to_cert['127.0.0.1', tls_server.port]['Cert Status'] == 'SUCCESS'
+    assert 'Status' not in host_to_cert['127.0.0.1', tls_server.port]
+    assert host_to_cert['127.0.0.1', closed_port]['Cert Status'] != 'SUCCESS'
+
+
+def test_async_certs_please_with_pre_resolved_addresses(tls_server):
+    resolver = aio.Resolver(addresses={'internal.cert-hero.test': ['127.0.0.1']})
+
+    host_to_cert = asyncio.run(aio.async_certs_please(
+        [f'internal.cert-hero.test:{tls_server.port}'], resolver=resolver))
+
+    assert host_to_cert[f'internal.cert-hero.test:{tls_server.port}']['Cert Status'] == 'SUCCESS'
+
+
+def test_async_certs_please_decode_processes(tls_server, cert_der):
+    from cert_hero import cert_hero
+
+    cert_hero._PARSED_CERTS.clear()
+
+    host_to_cert = asyncio.run(aio.async_certs_please(
+        [f'127.0.0.1:{tls_server.port}'], decode_processes=1, cert_only=True))
+
+    cert = host_to_cert[f'127.0.0.1:{tls_server.port}']
+    assert cert == cert_hero.cert_from_der(cert_der)
+    assert cert.der == cert_der
+
+
+def test_async_certs_please_invalid_target(tls_server):
+    host_to_cert = asyncio.run(aio.async_certs_please(
+        ['example.com:https', f'127.0.0.1:{tls_server.port}'], cert_only=True))
+
+    assert host_to_cert['example.com:https']['Cert Status'] == 'INVALID_TARGET'
+    assert host_to_cert[f'127.0.0.1:{tls_server.port}']['Cert Status'] == 'SUCCESS'
+
+
+def test_async_cert_please_handshake_timeout():
+    # a server which accepts the connection (in its backlog), but never answers the TLS handshake
+    with socket.socket() as server:
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+        port = server.getsockname()[1]
+
+        cert = asyncio.run(aio._async_cert_please(f'127.0.0.1:{port}', handshake_timeout=0.2, cert_only=True))
+
+    assert cert['Cert Status'] == 'TIMED_OUT'
+
+
+def test_async_cert_please_without_timeout(monkeypatch, tls_server):
+    open_connection = asyncio.open_connection
+    handshake_timeouts = []
+
+    async def spy_open_connection(*args, ssl_handshake_timeout=None, **kwargs):
+        handshake_timeouts.append(ssl_handshake_timeout)
+        return await open_connection(*args, ssl_handshake_timeout=ssl_handshake_timeout, **kwargs)
+
+    monkeypatch.setattr(asyncio, 'open_connection', spy_open_connection)
+
+    cert = asyncio.run(aio.async_cert_please(f'127.0.0.1:{tls_server.port}', timeout=None, cert_only=True))
+
+    assert cert['Cert Status'] == 'SUCCESS'
+    # not `None`, which `asyncio` takes to mean 60 seconds
+    assert handshake_timeouts[0] > 60
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+
+from cert_hero import CertCache, CertHero, certs_please
+from cert_hero import cert_hero
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with CertCache(str(tmp_path / 'certs.db')) as cache:
+        yield cache
+
+
+def test_cache_round_trip(cache, cert_der):
+    cert = cert_hero._build_cert(cert_der, 'https://cert-hero.test/', 301)
+
+    cache.set('cert-hero.test', cert)
+
+    cached = cache.get('cert-hero.test:443')
+    assert cached == cert
+    assert cached.der == cert_der
+    assert cached.not_after_date == cert.not_after_date
+
+    assert cache.get('cert-hero.test:8443') is None
+
+
+def test_cache_skips_failed_results(cache):
+    cache.set('cert-hero.test', cert_hero._build_failed_cert('TIMED_OUT'))
+
+    assert cache.get('cert-hero.test') is None
+
+
+def test_cache_max_age(tmp_path, cert_der):
+    with CertCache(str(tmp_path / 'certs.db'), max_age=-1) as cache:
+        cache.set('cert-hero.test', cert_hero._build_cert(cert_der))
+
+        assert cache.get('cert-hero.test') is None
+
+
+def test_cache_expiry_margin(tmp_path, cert_der):
+    cert = cert_hero._build_cert(cert_der)
+    days_left = (cert.not_after_date - CertCache._today()).days
+
+    with CertCache(str(tmp_path / 'certs.db'), expiry_margin=timedelta(days=days_left)) as cache:
+        cache.set('cert-hero.test', cert)
+
+        assert cache.get('cert-hero.test') is None
+
+
+def test_certs_please_with_cache(cache, tls_server):
+    target = f'127.0.0.1:{tls_server.port}'
+
+    host_to_cert = certs_please([target], cache=cache)
+    assert host_to_cert[target]['Cert Status'] == 'SUCCESS'
+    assert tls_server.num_requests == 1
+
+    host_to_cert_cached = certs_please([target], cache=cache)
+    assert host_to_cert_cached == host_to_cert
+    assert isinstance(host_to_cert_cached[target], CertHero)
+    assert tls_server.num_requests == 1
@@ -1,5 +1,13 @@
 """Tests for `cert_hero` package."""
 
+import errno
+import os
+import socket
+import ssl
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 
@@ -20,3 +28,460 @@ def test_content(response):
     """Sample pytest test function with the pytest fixture as an argument."""
     # from bs4 import BeautifulSoup
     # assert 'GitHub' in BeautifulSoup(response.content).title.string
+
+
+def test_build_cert(cert_der):
+    cert = cert_hero._build_cert(cert_der, 'https://cert-hero.test/', 301)
+
+    assert cert['Cert Status'] == 'SUCCESS'
+    assert cert['Subject Name'] == {
+        'Country': 'US',
+        'State/Province': 'California',
+        'Organization': 'Cert Hero',
+        'Common Name': '*.cert-hero.test',
+    }
+    assert cert['Wildcard'] is True
+    assert cert['Key Algorithm'] == 'RSA-2048'
+    assert cert['Subject Alt Names'] == ['*.cert-hero.test', 'cert-hero.test', 'localhost']
+    assert cert['Location'] == 'https://cert-hero.test/'
+    assert cert['Status'] == 301
+    assert cert.not_after_date.isoformat() == cert['Validity']['Not After']
+
+
+@pytest.mark.parametrize('data,expected', [
+    (b'HTTP/1.1 301 Moved Permanently\r\nLocation: https://www.google.com/\r\n\r\n',
+     (301, 'https://www.google.com/')),
+    (b'HTTP/1.0 200 OK\r\nContent-Length: 0\r\n\r\n', (200, None)),
+    (b'', (None, None)),
+])
+def test_parse_http_response(data, expected):
+    assert cert_hero._parse_http_response(data) == expected
+
+
+def test_iter_certs_please_yields_in_completion_order(monkeypatch):
+    import time
+
+    delays = {'slow.test': 0.2, 'fast.test': 0.0, 'bad.test': 0.1}
+
+    def fake_cert_please(hostname, *args, **kwargs):
+        time.sleep(delays[hostname])
+        return cert_hero.CertHero({'Cert Status': 'CONNECTION_REFUSED' if hostname == 'bad.test' else 'SUCCESS'})
+
+    monkeypatch.setattr(cert_hero, '_cert_please', fake_cert_please)
+
+    results = list(cert_hero.iter_certs_please(delays))
+    assert [host for host, _ in results] == ['fast.test', 'bad.test', 'slow.test']
+    assert results[1][1]['Cert Status'] == 'CONNECTION_REFUSED'
+
+    # `certs_please()` still returns results in the original order
+    assert list(cert_hero.certs_please(list(delays))) == list(delays)
+
+
+def test_iter_certs_please_consumes_hostnames_lazily(monkeypatch):
+    consumed = 0
+
+    def fake_cert_please(hostname, *args, **kwargs):
+        return cert_hero.CertHero({'Cert Status': 'SUCCESS'})
+
+    def hostnames():
+        nonlocal consumed
+        for i in range(1000):
+            consumed += 1
+            yield f'host-{i}.test'
+
+    monkeypatch.setattr(cert_hero, '_cert_please', fake_cert_please)
+
+    results = cert_hero.iter_certs_please(hostnames(), num_threads=2, max_pending=4)
+    host, cert = next(results)
+    results.close()
+
+    assert cert['Cert Status'] == 'SUCCESS'
+    assert consumed == 4
+
+
+def test_recv_http_head_stops_at_end_of_headers():
+    import socket
+
+    server, client = socket.socketpair()
+    with server, client:
+        server.sendall(b'HTTP/1.1 301 Moved Permanently\r\nLocation: /here\r\n')
+        server.sendall(b'\r\n' + b'x' * 100_000)
+
+        data = cert_hero._recv_http_head(client, max_size=1024)
+
+    assert data.startswith(b'HTTP/1.1 301 Moved Permanently\r\nLocation: /here\r\n\r\n')
+    assert len(data) <= 1024
+    assert cert_hero._parse_http_response(data) == (301, '/here')
+
+
+def test_recv_http_head_is_capped():
+    import socket
+
+    server, client = socket.socketpair()
+    with server, client:
+        server.sendall(b'HTTP/1.1 200 OK\r\nX-Large: ' + b'x' * 10_000)
+        data = cert_hero._recv_http_head(client, max_size=512)
+
+    assert len(data) == 512
+    assert cert_hero._parse_http_response(data) == (200, None)
+
+
+def test_iter_certs_please_deadline(monkeypatch):
+    import time
+
+    def fake_cert_please(hostname, *args, **kwargs):
+        time.sleep(0.05 if hostname == 'fast.test' else 1)
+        return cert_hero.CertHero({'Cert Status': 'SUCCESS'})
+
+    monkeypatch.setattr(cert_hero, '_cert_please', fake_cert_please)
+
+    start = time.monotonic()
+    host_to_cert = cert_hero.certs_please(
+        ['fast.test', 'slow.test', 'never-started.test'], num_threads=2, max_pending=2, deadline=0.2)
+
+    assert time.monotonic() - start < 0.5
+    assert {host: cert['Cert Status'] for host, cert in host_to_cert.items()} == {
+        'fast.test': 'SUCCESS',
+        'slow.test': 'DEADLINE_EXCEEDED',
+        'never-started.test': 'DEADLINE_EXCEEDED',
+    }
+
+
+def test_cert_please_with_host_and_port(tls_server):
+    cert = cert_hero.cert_please(f'127.0.0.1:{tls_server.port}')
+
+    assert cert['Cert Status'] == 'SUCCESS'
+    assert cert['Subject Name']['Common Name'] == '*.cert-hero.test'
+    assert cert['Location'] == 'https://cert-hero.test/'
+    assert cert['Status'] == 301
+
+
+def test_cert_please_cert_only(tls_server):
+    cert = cert_hero.cert_please(('127.0.0.1', tls_server.port), cert_only=True)
+
+    assert cert['Cert Status'] == 'SUCCESS'
+    assert 'Location' not in cert
+    assert 'Status' not in cert
+    assert tls_server.num_requests == 0
+
+
+def test_cert_please_without_timeout(tls_server):
+    cert = cert_hero.cert_please(f'127.0.0.1:{tls_server.port}', timeout=None, cert_only=True)
+
+    assert cert['Cert Status'] == 'SUCCESS'
+
+
+def test_certs_please_with_ports(tls_server, closed_port):
+    host_to_cert = cert_hero.certs_please(['127.0.0.1'], ports=[tls_server.port, closed_port])
+
+    assert list(host_to_cert) == [('127.0.0.1', tls_server.port), ('127.0.0.1', closed_port)]
+    assert host_to_cert['127.0.0.1', tls_server.port]['Cert Status'] == 'SUCCESS'
+    assert host_to_cert['127.0.0.1', closed_port]['Cert Status'] != 'SUCCESS'
+
+
+@pytest.mark.parametrize('target,port,expected', [
+    ('example.com', None, ('example.com', 443)),
+    ('example.com:8443', None, ('example.com', 8443)),
+    ('example.com:8443', 636, ('example.com', 636)),
+    ('[::1]:993', None, ('::1', 993)),
+    ('[::1]', None, ('::1', 443)),
+    ('2001:db8::1', None, ('2001:db8::1', 443)),
+    (('example.com', 5671), None, ('example.com', 5671)),
+])
+def test_parse_target(target, port, expected):
+    assert cert_hero._parse_target(target, port) == expected
+
+
+@pytest.mark.parametrize('target', ['example.com:https', ':443', 'example.com:0', ('example.com', 65536)])
+def test_parse_target_invalid(target):
+    with pytest.raises(ValueError):
+        cert_hero._parse_target(target)
+
+
+def test_certs_please_invalid_target(tls_server):
+    host_to_cert = cert_hero.certs_please(['example.com:https', '127.0.0.1'], ports=[tls_server.port],
+                                          cert_only=True)
+
+    assert host_to_cert['example.com:https']['Cert Status'] == 'INVALID_TARGET'
+    assert host_to_cert['127.0.0.1', tls_server.port]['Cert Status'] == 'SUCCESS'
+
+
+def test_expand_targets():
+    assert list(cert_hero._expand_targets(['a.test', 'b.test:8443'], ports=[443, 993])) == [
+        ('a.test', 443), ('a.test', 993), ('b.test', 8443),
+    ]
+    assert list(cert_hero._expand_targets(['a.test', 'b.test:8443'])) == ['a.test', 'b.test:8443']
+
+
+def test_interleave_addr_infos():
+    import socket
+
+    v4 = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (f'192.0.2.{i}', 443)) for i in range(3)]
+    v6 = [(socket.AF_INET6, socket.SOCK_STREAM, 6, '', (f'2001:db8::{i}', 443, 0, 0)) for i in range(2)]
+
+    assert cert_hero._interleave_addr_infos(v6 + v4) == [v6[0], v4[0], v6[1], v4[1], v4[2]]
+
+
+def test_connect_happy_eyeballs_skips_dead_addresses(tls_server, closed_port):
+    import socket
+    import time
+
+    addr_infos = [
+        # refuses the connection right away
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', closed_port)),
+        # (likely) never answers
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', tls_server.port)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', tls_server.port)),
+    ]
+
+    start = time.monotonic()
+    with cert_hero._connect_happy_eyeballs(addr_infos, timeout=3, delay=0.05) as sock:
+        assert sock.getpeername() == ('127.0.0.1', tls_server.port)
+    assert time.monotonic() - start < 1
+
+
+def test_connect_happy_eyeballs_without_ipv6(monkeypatch, tls_server):
+    class NoIPv6Socket(socket.socket):
+        def __init__(self, family=-1, *args, **kwargs):
+            if family == socket.AF_INET6:
+                raise OSError(errno.EAFNOSUPPORT, os.strerror(errno.EAFNOSUPPORT))
+            super().__init__(family, *args, **kwargs)
+
+    monkeypatch.setattr(socket, 'socket', NoIPv6Socket)
+
+    addr_infos = [
+        (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('::1', tls_server.port, 0, 0)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', tls_server.port)),
+    ]
+
+    with cert_hero._connect_happy_eyeballs(addr_infos, timeout=2) as sock:
+        assert sock.getpeername() == ('127.0.0.1', tls_server.port)
+
+
+def test_connect_happy_eyeballs_all_fail(closed_port):
+    import socket
+
+    addr_infos = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', closed_port))]
+
+    with pytest.raises(ConnectionRefusedError):
+        cert_hero._connect_happy_eyeballs(addr_infos, timeout=1)
+
+
+def test_cert_please_ipv6(tls_server_v6):
+    cert = cert_hero.cert_please(f'[::1]:{tls_server_v6.port}')
+
+    assert cert['Cert Status'] == 'SUCCESS'
+    assert cert['Status'] == 301
+
+
+def test_certs_please_with_pre_resolved_addresses(tls_server):
+    resolver = cert_hero.Resolver(addresses={'internal.cert-hero.test': ['127.0.0.1']})
+
+    host_to_cert = cert_hero.certs_please(
+        ['internal.cert-hero.test', 'missing.cert-hero.invalid'], ports=[tls_server.port], resolver=resolver)
+
+    assert host_to_cert['internal.cert-hero.test', tls_server.port]['Cert Status'] == 'SUCCESS'
+    assert host_to_cert['missing.cert-hero.invalid', tls_server.port]['Cert Status'] != 'SUCCESS'
+
+
+def test_build_cert_parses_each_cert_once(cert_der, monkeypatch):
+    import hashlib
+
+    cert_hero._PARSED_CERTS.clear()
+    num_parsed = 0
+    _parse_cert = cert_hero._parse_cert
+
+    def counting_parse_cert(cert_bin):
+        nonlocal num_parsed
+        num_parsed += 1
+        return _parse_cert(cert_bin)
+
+    monkeypatch.setattr(cert_hero, '_parse_cert', counting_parse_cert)
+
+    cert_1 = cert_hero._build_cert(cert_der, 'https://a.cert-hero.test/', 301)
+    cert_2 = cert_hero._build_cert(cert_der, None, 200)
+
+    assert num_parsed == 1
+    assert cert_1.fingerprint == cert_2.fingerprint == hashlib.sha256(cert_der).hexdigest().upper()
+    assert cert_1['Subject Name'] == cert_2['Subject Name']
+    assert cert_1['Location'] == 'https://a.cert-hero.test/'
+    assert 'Location' not in cert_2
+    assert (cert_1['Status'], cert_2['Status']) == (301, 200)
+
+    # `Validity` is not shared between hosts
+    cert_hero.set_expired(cert_1)
+    assert 'Expired' not in cert_2['Validity']
+
+
+def test_lru_cache():
+    cache = cert_hero._LRUCache(maxsize=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache.get('a') == 1
+    cache['c'] = 3
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+
+def test_lazy_cert_hero_decodes_on_demand(cert_der, monkeypatch):
+    decoded = []
+    for name, fn in cert_hero._CERT_FIELDS.items():
+        def tracking_fn(x509, _name=name, _fn=fn):
+            decoded.append(_name)
+            return _fn(x509)
+        monkeypatch.setitem(cert_hero._CERT_FIELDS, name, tracking_fn)
+
+    cert = cert_hero.LazyCertHero(cert_der, 'https://cert-hero.test/', 301)
+
+    assert cert
+    assert 'Serial' in cert
+    assert cert.not_after_date.year == 2126
+    cert_hero.set_expired(cert)
+    assert cert['Validity']['Expired'] is False
+    assert decoded == ['Validity']
+
+    assert cert['Location'] == 'https://cert-hero.test/'
+    assert decoded == ['Validity']
+
+
+def test_lazy_cert_hero_matches_cert_hero(cert_der):
+    import json
+    import pickle
+
+    eager = cert_hero._build_cert(cert_der, 'https://cert-hero.test/', 301)
+    lazy = cert_hero._build_cert(cert_der, 'https://cert-hero.test/', 301, lazy=True)
+
+    assert isinstance(lazy, cert_hero.LazyCertHero)
+    assert lazy.fingerprint == eager.fingerprint
+    assert json.dumps(lazy) == json.dumps(eager)
+    assert list(lazy) == list(eager)
+    assert repr(lazy) == repr(eager).replace('CertHero', 'LazyCertHero', 1)
+    assert lazy == eager
+
+    restored = pickle.loads(pickle.dumps(cert_hero._build_cert(cert_der, lazy=True)))
+    assert type(restored) is cert_hero.CertHero
+    assert restored['Serial'] == eager['Serial']
+    assert restored.not_after_date == eager.not_after_date
+
+
+def test_cert_please_lazy(tls_server):
+    cert = cert_hero.cert_please(('127.0.0.1', tls_server.port), lazy=True)
+
+    assert isinstance(cert, cert_hero.LazyCertHero)
+    assert cert['Subject Name']['Common Name'] == '*.cert-hero.test'
+    assert cert['Status'] == 301
+
+
+def test_cert_from_pem_and_der(cert_pem_file, cert_der):
+    with open(cert_pem_file) as f:
+        pem = f.read()
+
+    cert = cert_hero.cert_from_pem(pem)
+
+    assert cert == cert_hero.cert_from_der(cert_der)
+    assert cert['Subject Name']['Common Name'] == '*.cert-hero.test'
+    assert 'Location' not in cert
+    assert cert.der == cert_der
+
+    with pytest.raises(ValueError):
+        cert_hero.cert_from_pem('not a cert')
+
+
+def test_certs_from_paths(tmp_path, cert_pem_file, cert_der):
+    with open(cert_pem_file, 'rb') as f:
+        pem = f.read()
+
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'bundle.pem').write_bytes(pem + pem)
+    (tmp_path / 'sub' / 'server.der').write_bytes(cert_der)
+    (tmp_path / 'sub' / 'bad.crt').write_bytes(b'garbage')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    missing = str(tmp_path / 'missing.pem')
+
+    results = list(cert_hero.certs_from_paths([tmp_path, missing], num_processes=2, chunk_size=2))
+
+    statuses = sorted((os.path.basename(path), cert['Cert Status']) for path, cert in results)
+    assert statuses == [
+        ('bad.crt', 'INVALID_CERT'),
+        ('bundle.pem', 'SUCCESS'),
+        ('bundle.pem', 'SUCCESS'),
+        ('missing.pem', 'READ_ERROR'),
+        ('server.der', 'SUCCESS'),
+    ]
+    for _, cert in results:
+        if cert['Cert Status'] == 'SUCCESS':
+            assert cert.fingerprint == cert_hero.cert_from_der(cert_der).fingerprint
+
+
+def test_certs_please_decode_processes(tls_server, cert_der):
+    cert_hero._PARSED_CERTS.clear()
+
+    host_to_cert = cert_hero.certs_please(
+        [f'127.0.0.1:{tls_server.port}'], decode_processes=1, cert_only=True)
+
+    cert = host_to_cert[f'127.0.0.1:{tls_server.port}']
+    assert cert == cert_hero.cert_from_der(cert_der)
+    assert cert.der == cert_der
+
+
+def test_cert_please_decode_pool_error_is_not_invalid_cert(tls_server):
+    # an error in the pool itself (rather than in the cert) is raised, not reported as INVALID_CERT
+    pool = ThreadPoolExecutor(1)
+    pool.shutdown()
+    cert_hero._PARSED_CERTS.clear()
+
+    with pytest.raises(RuntimeError):
+        cert_hero._cert_please(f'127.0.0.1:{tls_server.port}', cert_only=True, decode_pool=pool)
+
+
+@pytest.mark.parametrize('error,status', [
+    (socket.gaierror(socket.EAI_NONAME, 'Name or service not known'), 'DNS_NOT_FOUND'),
+    (socket.gaierror(socket.EAI_AGAIN, 'Temporary failure in name resolution'), 'DNS_ERROR'),
+    (socket.timeout('timed out'), 'TIMED_OUT'),
+    (OSError(errno.ECONNREFUSED, 'Connection refused'), 'CONNECTION_REFUSED'),
+    (OSError(errno.EHOSTUNREACH, 'No route to host'), 'HOST_UNREACHABLE'),
+    (ConnectionResetError(), 'CONNECTION_RESET'),
+    (ssl.SSLEOFError(), 'SSL_EOF'),
+    (ssl.SSLError(), 'SSL_ERROR'),
+    (ValueError(), 'ERROR'),
+])
+def test_failure_status(error, status):
+    assert cert_hero._failure_status(error) == status
+
+
+def test_certs_please_failure_status(closed_port):
+    host_to_cert = cert_hero.certs_please([f'127.0.0.1:{closed_port}'])
+
+    cert = host_to_cert[f'127.0.0.1:{closed_port}']
+    assert cert['Cert Status'] == 'CONNECTION_REFUSED'
+    assert cert['Cert Status'] not in cert_hero._TRANSIENT_STATUSES
+    assert cert.elapsed >= 0
+
+    assert cert_hero.cert_please(f'127.0.0.1:{closed_port}') is None
+
+
+def test_import_is_lazy():
+    import subprocess
+
+    code = (
+        'import sys, cert_hero, cert_hero.cli, cert_hero.journal\n'
+        'heavy = ("asn1crypto", "asyncio", "sqlite3", "multiprocessing", "fake_useragent", "cert_hero.aio")\n'
+        'print(sorted(m for m in heavy if m in sys.modules))\n'
+        'cert_hero.async_cert_please, cert_hero.CertCache\n'
+        'print(sorted(m for m in heavy if m in sys.modules))\n'
+        'print("RateLimit" in dir(cert_hero))\n'
+    )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+    assert out.splitlines() == ['[]', "['asyncio', 'cert_hero.aio', 'sqlite3']", 'True']
+
+
+def test_get_user_agent(monkeypatch):
+    # `fake_useragent` is only imported on the first call
+    monkeypatch.setattr(cert_hero, '_FAKE_UA', None)
+    monkeypatch.setitem(sys.modules, 'fake_useragent', None)  # not installed
+
+    assert cert_hero.get_user_agent() == cert_hero._REQUESTS_USER_AGENT
+    assert cert_hero._FAKE_UA is False
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+
+from cert_hero import cli
+
+
+def test_cli_jsonl_from_input_file(tmp_path, capsys, tls_server, closed_port):
+    targets = [f'127.0.0.1:{tls_server.port}', f'127.0.0.1:{closed_port}']
+    hosts_file = tmp_path / 'hosts.txt'
+    hosts_file.write_text(f'# hosts to scan\n{targets[0]}\n\n{targets[1]}\n')
+
+    assert cli.main(['--input', str(hosts_file), '--format', 'jsonl', '--timeout', '1']) == 0
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    host_to_status = {line['Host']: line['Cert Status'] for line in lines}
+    assert host_to_status == {targets[0]: 'SUCCESS', targets[1]: 'CONNECTION_REFUSED'}
+
+
+def test_cli_json_with_ports(capsys, tls_server, closed_port):
+    args = ['127.0.0.1', '--port', str(tls_server.port), '--port', str(closed_port), '--cert-only', '-f', 'json']
+    assert cli.main(args) == 0
+
+    host_to_cert = json.loads(capsys.readouterr().out)
+    assert host_to_cert[f'127.0.0.1:{tls_server.port}']['Validity']['Expired'] is False
+    assert 'Location' not in host_to_cert[f'127.0.0.1:{tls_server.port}']
+    assert host_to_cert[f'127.0.0.1:{closed_port}']['Cert Status'] == 'CONNECTION_REFUSED'
+
+
+def test_cli_json_without_hosts(capsys):
+    assert cli.main(['--format', 'json']) == 0
+    assert json.loads(capsys.readouterr().out) == {}
+
+
+def test_cli_csv(capsys, tls_server):
+    target = f'127.0.0.1:{tls_server.port}'
+
+    assert cli.main([target, '--format', 'csv', '--concurrency', '2']) == 0
+
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert list(rows[0]) == list(cli.CSV_COLUMNS)
+    assert rows[0]['Host'] == target
+    assert rows[0]['Cert Status'] == 'SUCCESS'
+    assert rows[0]['Status'] == '301'
+    assert rows[0]['Expired'] == 'False'
+
+
+def test_cli_shard_with_ports(capsys, tls_server, closed_port):
+    from cert_hero.shard import shard_of
+
+    targets = [('127.0.0.1', tls_server.port), ('127.0.0.1', closed_port)]
+    for index in range(2):
+        args = ['127.0.0.1', '--port', str(tls_server.port), '--port', str(closed_port),
+                '--shard', f'{index + 1}/2', '--cert-only', '-f', 'jsonl', '--timeout', '1']
+        assert cli.main(args) == 0
+
+        hosts = {json.loads(line)['Host'] for line in capsys.readouterr().out.splitlines()}
+        assert hosts == {cli._host(t) for t in targets if shard_of(t, 2) == index}
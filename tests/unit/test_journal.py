@@ -0,0 +1,110 @@
+import asyncio
+
+from datetime import date
+
+import pytest
+
+from cert_hero import SweepJournal, aio, cert_hero, certs_please
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return tmp_path / 'sweep.jsonl'
+
+
+def test_journal_round_trip(journal_path, cert_der):
+    cert = cert_hero._build_cert(cert_der, 'https://cert-hero.test/', 301)
+
+    with SweepJournal(journal_path) as journal:
+        journal.record('cert-hero.test', cert)
+        journal.record('refused.test', cert_hero._build_failed_cert('CONNECTION_REFUSED'))
+
+    with SweepJournal(journal_path) as journal:
+        assert len(journal) == 2
+        assert 'cert-hero.test:443' in journal
+        assert journal.get(('cert-hero.test', 443)) == cert
+        assert journal.get('cert-hero.test').not_after_date == cert.not_after_date
+        assert journal.get('refused.test')['Cert Status'] == 'CONNECTION_REFUSED'
+        assert journal.get('cert-hero.test:8443') is None
+
+        assert [target for target, _ in journal.results()] == ['cert-hero.test:443', 'refused.test:443']
+
+
+def test_certs_please_resumes_failed_host_from_journal(journal_path, closed_port, tls_server):
+    targets = [f'127.0.0.1:{closed_port}', f'127.0.0.1:{tls_server.port}']
+
+    with SweepJournal(journal_path) as journal:
+        scanned = certs_please(targets, journal=journal, cert_only=True)
+    with SweepJournal(journal_path) as journal:
+        resumed = certs_please(targets, journal=journal, cert_only=True)
+
+    failed = resumed[targets[0]]
+    assert failed['Cert Status'] == 'CONNECTION_REFUSED'
+    assert failed.not_after_date == failed.not_before_date == date.min
+    assert failed.elapsed == scanned[targets[0]].elapsed
+
+    cert = resumed[targets[1]]
+    assert cert == scanned[targets[1]]
+    assert cert.der == scanned[targets[1]].der
+    assert cert.fingerprint == scanned[targets[1]].fingerprint
+    assert cert.elapsed == scanned[targets[1]].elapsed
+
+
+def test_journal_drops_partial_line(journal_path):
+    with SweepJournal(journal_path) as journal:
+        journal.record('ok.test', cert_hero.CertHero({'Cert Status': 'SUCCESS'}))
+
+    # a crash in the middle of writing a line
+    with journal_path.open('ab') as f:
+        f.write(b'{"target": "partial.test:443", "ce')
+
+    with SweepJournal(journal_path) as journal:
+        assert len(journal) == 1
+        journal.record('next.test', cert_hero.CertHero({'Cert Status': 'SUCCESS'}))
+
+    with SweepJournal(journal_path) as journal:
+        assert [target for target, _ in journal.results()] == ['ok.test:443', 'next.test:443']
+
+
+def test_certs_please_resumes_from_journal(monkeypatch, journal_path):
+    scanned = []
+
+    def fake_cert_please(hostname, *args, **kwargs):
+        scanned.append(hostname)
+        if hostname == 'crash.test':
+            raise KeyboardInterrupt
+        return cert_hero.CertHero({'Cert Status': 'SUCCESS', 'Location': hostname})
+
+    monkeypatch.setattr(cert_hero, '_cert_please', fake_cert_please)
+    hosts = [f'{i}.test' for i in range(5)]
+
+    with SweepJournal(journal_path) as journal, pytest.raises(KeyboardInterrupt):
+        certs_please(hosts[:3] + ['crash.test'], num_threads=1, journal=journal)
+    assert scanned == hosts[:3] + ['crash.test']
+
+    scanned.clear()
+    with SweepJournal(journal_path) as journal:
+        host_to_cert = certs_please(hosts, num_threads=1, journal=journal)
+
+    # only the hosts which weren't recorded before the crash are scanned again
+    # (the last one may have completed alongside `crash.test`)
+    assert scanned in (hosts[3:], hosts[2:])
+    assert list(host_to_cert) == hosts
+    assert all(host_to_cert[host]['Location'] == host for host in hosts)
+
+
+def test_async_certs_please_resumes_from_journal(monkeypatch, journal_path):
+    scanned = []
+
+    async def fake_cert_please(hostname, *args, **kwargs):
+        scanned.append(hostname)
+        return aio.CertHero({'Cert Status': 'SUCCESS'})
+
+    monkeypatch.setattr(aio, '_async_cert_please', fake_cert_please)
+
+    with SweepJournal(journal_path) as journal:
+        asyncio.run(aio.async_certs_please(['a.test', 'b.test'], journal=journal))
+        host_to_cert = asyncio.run(aio.async_certs_please(['a.test', 'b.test', 'c.test'], journal=journal))
+
+    assert scanned == ['a.test', 'b.test', 'c.test']
+    assert list(host_to_cert) == ['a.test', 'b.test', 'c.test']
@@ -0,0 +1,280 @@
+"""Tests for `cert_hero.policies` module."""
+import asyncio
+from collections import Counter
+
+from cert_hero import RetryPolicy, aio, cert_hero
+from cert_hero.policies import RetryBudget
+
+
+def test_retry_policy():
+    policy = RetryPolicy(max_attempts=3, backoff=1, max_backoff=3, jitter=False)
+
+    assert [policy.delay(attempt) for attempt in (1, 2, 3)] == [1, 2, 3]
+    assert 0 <= RetryPolicy(backoff=1).delay(2) <= 2
+
+    timed_out = cert_hero._build_failed_cert('TIMED_OUT')
+    assert policy.should_retry(timed_out, 1)
+    assert not policy.should_retry(timed_out, 3)
+    assert not policy.should_retry(cert_hero._build_failed_cert('DNS_NOT_FOUND'), 1)
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, minimum=1)
+    for _ in range(4):
+        budget.add_attempt()
+
+    assert [budget.spend() for _ in range(4)] == [True, True, True, False]
+
+
+def _flaky(attempts):
+    def status(hostname):
+        attempts[hostname] += 1
+        if hostname == 'refused.test':
+            return 'CONNECTION_REFUSED'
+        if hostname == 'flaky.test' and attempts[hostname] < 3:
+            return 'TIMED_OUT'
+        return 'SUCCESS'
+    return status
+
+
+def test_iter_certs_please_retries(monkeypatch):
+    attempts = Counter()
+    status = _flaky(attempts)
+
+    def fake_cert_please(hostname, *args, **kwargs):
+        return cert_hero.CertHero({'Cert Status': status(hostname)})
+
+    monkeypatch.setattr(cert_hero, '_cert_please', fake_cert_please)
+
+    host_to_cert = cert_hero.certs_please(
+        ['flaky.test', 'refused.test', 'ok.test'],
+        retry=RetryPolicy(max_attempts=3, backoff=0.01, jitter=False),
+    )
+
+    assert {host: cert['Cert Status'] for host, cert in host_to_cert.items()} == {
+        'flaky.test': 'SUCCESS', 'refused.test': 'CONNECTION_REFUSED', 'ok.test': 'SUCCESS',
+    }
+    assert attempts == {'flaky.test': 3, 'refused.test': 1, 'ok.test': 1}
+
+
+def test_iter_certs_please_retry_budget(monkeypatch):
+    attempts = Counter()
+
+    def fake_cert_please(hostname, *args, **kwargs):
+        attempts[hostname] += 1
+        return cert_hero.CertHero({'Cert Status': 'TIMED_OUT'})
+
+    monkeypatch.setattr(cert_hero, '_cert_please', fake_cert_please)
+
+    hosts = [f'{i}.test' for i in range(10)]
+    cert_hero.certs_please(hosts, retry=RetryPolicy(backoff=0, budget_ratio=0.2, budget_min=0))
+
+    assert sum(attempts.values()) == 12
+
+
+def test_async_iter_certs_please_retries(monkeypatch):
+    attempts = Counter()
+    status = _flaky(attempts)
+
+    async def fake_cert_please(hostname, *args, **kwargs):
+        return aio.CertHero({'Cert Status': status(hostname)})
+
+    monkeypatch.setattr(aio, '_async_cert_please', fake_cert_please)
+
+    host_to_cert = asyncio.run(aio.async_certs_please(
+        ['flaky.test', 'refused.test', 'ok.test'],
+        retry=RetryPolicy(max_attempts=3, backoff=0.01, jitter=False),
+    ))
+
+    assert host_to_cert['flaky.test']['Cert Status'] == 'SUCCESS'
+    assert attempts == {'flaky.test': 3, 'refused.test': 1, 'ok.test': 1}
+
+
+def test_adaptive_concurrency():
+    from cert_hero import AdaptiveConcurrency
+
+    adaptive = AdaptiveConcurrency(initial=10, minimum=2, maximum=12)
+
+    ok = cert_hero.CertHero({'Cert Status': 'SUCCESS'})
+    # about one more for each window of hosts
+    for _ in range(11):
+        adaptive.record(ok, now=1.0)
+    assert adaptive.limit == 11
+
+    timed_out = cert_hero._build_failed_cert('TIMED_OUT')
+    timed_out._elapsed = 3.0
+    adaptive.record(timed_out, now=10.0)
+    assert adaptive.limit == 5
+    # started before the last decrease, so it's not counted again
+    adaptive.record(timed_out, now=11.0)
+    assert adaptive.limit == 5
+    adaptive.record(timed_out, now=14.0)
+    assert adaptive.limit == 2
+    adaptive.record(timed_out, now=20.0)
+    assert adaptive.limit == 2
+
+    for _ in range(1000):
+        adaptive.record(ok)
+    assert adaptive.limit == 12
+
+    slow = cert_hero.CertHero({'Cert Status': 'SUCCESS'})
+    slow._elapsed = 2.0
+    adaptive.latency_target = 1.0
+    adaptive.record(slow)
+    assert adaptive.limit == 6
+
+
+def test_async_iter_certs_please_adaptive(monkeypatch):
+    from cert_hero import AdaptiveConcurrency
+
+    in_flight = max_in_flight = 0
+
+    async def fake_cert_please(hostname, *args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        cert = aio.CertHero({'Cert Status': 'TIMED_OUT'})
+        cert._elapsed = 0.001
+        return cert
+
+    monkeypatch.setattr(aio, '_async_cert_please', fake_cert_please)
+
+    adaptive = AdaptiveConcurrency(initial=8, minimum=1)
+    asyncio.run(aio.async_certs_please([f'{i}.test' for i in range(50)], concurrency=1000, adaptive=adaptive))
+
+    assert max_in_flight == 8
+    assert adaptive.limit == 1
+
+
+def test_rate_limit():
+    from cert_hero import RateLimit
+
+    rate_limit = RateLimit(rate=10, burst=2)
+    assert rate_limit.delay() == 0
+    rate_limit.take()
+    rate_limit.take()
+    assert 0 < rate_limit.delay() <= 0.1
+    rate_limit.refund()
+    assert rate_limit.delay() == 0
+
+    rate_limit = RateLimit(per_ip=1, per_subnet=2)
+    assert rate_limit.acquire('10.0.0.1') is None
+    assert rate_limit.acquire('10.0.0.1') == '10.0.0.1'
+    assert rate_limit.acquire('10.0.0.2') is None
+    # 10.0.0.1 and 10.0.0.2 share the same /24
+    assert rate_limit.acquire('10.0.0.3') == '10.0.0.0/24'
+    assert rate_limit.acquire('10.0.1.1') is None
+    assert not rate_limit.available('10.0.0.0/24')
+
+    rate_limit.release('10.0.0.1')
+    assert rate_limit.available('10.0.0.1')
+    assert rate_limit.available('10.0.0.0/24')
+    assert rate_limit.acquire('10.0.0.3') is None
+
+    assert RateLimit(per_subnet=1)._destinations('2001:db8::1') == ['2001:db8::/64']
+
+
+def _fake_ip(hostname):
+    # all the `slow-*` hosts resolve to the same IP address
+    return '10.0.0.1' if hostname.startswith('slow-') else f'10.0.1.{hostname.split(".")[0]}'
+
+
+def test_iter_certs_please_rate_limit(monkeypatch):
+    import time
+    import threading
+    from cert_hero import RateLimit
+
+    lock = threading.Lock()
+    in_flight = Counter()
+    max_in_flight = Counter()
+
+    def fake_cert_please(hostname, *args, rate_limit=None, **kwargs):
+        ip = _fake_ip(hostname)
+        if (destination := rate_limit.acquire(ip)) is not None:
+            return cert_hero._build_throttled_cert(destination)
+        try:
+            with lock:
+                in_flight[ip] += 1
+                max_in_flight[ip] = max(max_in_flight[ip], in_flight[ip])
+            time.sleep(0.01)
+            with lock:
+                in_flight[ip] -= 1
+            return cert_hero.CertHero({'Cert Status': 'SUCCESS'})
+        finally:
+            rate_limit.release(ip)
+
+    monkeypatch.setattr(cert_hero, '_cert_please', fake_cert_please)
+
+    hosts = [f'slow-{i}.test' for i in range(5)] + [f'{i}.test' for i in range(10)]
+    host_to_cert = cert_hero.certs_please(hosts, num_threads=10, rate_limit=RateLimit(per_ip=2))
+
+    assert list(host_to_cert) == hosts
+    assert all(cert['Cert Status'] == 'SUCCESS' for cert in host_to_cert.values())
+    assert max_in_flight['10.0.0.1'] == 2
+
+
+def test_iter_certs_please_rate_limit_holds_window(monkeypatch):
+    import time
+    from itertools import islice
+    from cert_hero import RateLimit
+
+    def fake_cert_please(hostname, *args, rate_limit=None, **kwargs):
+        ip = _fake_ip(hostname)
+        if (destination := rate_limit.acquire(ip)) is not None:
+            return cert_hero._build_throttled_cert(destination)
+        try:
+            time.sleep(0.01)
+            return cert_hero.CertHero({'Cert Status': 'SUCCESS'})
+        finally:
+            rate_limit.release(ip)
+
+    monkeypatch.setattr(cert_hero, '_cert_please', fake_cert_please)
+
+    num_read = 0
+
+    def hosts():
+        nonlocal num_read
+        for i in range(100_000):
+            num_read += 1
+            yield f'slow-{i}.test'
+
+    rate_limit = RateLimit(rate=1000, per_ip=1)
+    results = list(islice(cert_hero.iter_certs_please(hosts(), max_pending=8, rate_limit=rate_limit), 3))
+
+    assert [cert['Cert Status'] for _, cert in results] == ['SUCCESS'] * 3
+    # hosts set aside for their destination count against `max_pending`
+    assert num_read <= 3 + 8
+    # ...and a host which was set aside didn't spend a token
+    assert rate_limit.delay() == 0
+
+
+def test_async_iter_certs_please_rate_limit(monkeypatch):
+    from cert_hero import RateLimit
+
+    in_flight = Counter()
+    max_in_flight = Counter()
+
+    async def fake_cert_please(hostname, *args, rate_limit=None, **kwargs):
+        ip = _fake_ip(hostname)
+        if (destination := rate_limit.acquire(ip)) is not None:
+            return cert_hero._build_throttled_cert(destination)
+        try:
+            in_flight[ip] += 1
+            max_in_flight[ip] = max(max_in_flight[ip], in_flight[ip])
+            await asyncio.sleep(0.01)
+            in_flight[ip] -= 1
+            return aio.CertHero({'Cert Status': 'SUCCESS'})
+        finally:
+            rate_limit.release(ip)
+
+    monkeypatch.setattr(aio, '_async_cert_please', fake_cert_please)
+
+    hosts = [f'slow-{i}.test' for i in range(5)] + [f'{i}.test' for i in range(10)]
+    host_to_cert = asyncio.run(aio.async_certs_please(hosts, rate_limit=RateLimit(rate=1000, per_ip=1)))
+
+    assert list(host_to_cert) == hosts
+    assert all(cert['Cert Status'] == 'SUCCESS' for cert in host_to_cert.values())
+    assert max_in_flight['10.0.0.1'] == 1
+    assert max(max_in_flight.values()) == 1
@@ -0,0 +1,49 @@
+"""Tests for `cert_hero.record` module."""
+import json
+import pickle
+
+from cert_hero import cert_hero, set_expired
+from cert_hero.record import CertRecord
+
+
+def test_cert_record_round_trip(cert_der):
+    cert = cert_hero._build_cert(cert_der, 'https://cert-hero.test/', 301)
+    set_expired(cert)
+
+    record = CertRecord.from_dict(cert)
+
+    assert not hasattr(record, '__dict__')
+    assert isinstance(record.serial, int)
+    assert record.not_after_date == cert.not_after_date
+    assert record.not_before_date == cert.not_before_date
+    assert record.der is None
+
+    restored = record.to_cert_hero()
+    assert json.dumps(restored) == json.dumps(cert)
+    assert restored.not_after_date == cert.not_after_date
+
+    # JSON -> record -> JSON
+    data = json.loads(json.dumps(cert))
+    assert json.dumps(CertRecord.from_dict(data).to_dict()) == json.dumps(data)
+    assert pickle.loads(pickle.dumps(record)) == record
+
+    assert CertRecord.from_dict(cert, keep_der=True).to_cert_hero().der == cert_der
+
+
+def test_cert_record_shares_issuer(cert_der):
+    data = json.loads(json.dumps(cert_hero._build_cert(cert_der)))
+    record_1 = CertRecord.from_dict(data)
+    record_2 = CertRecord.from_dict(json.loads(json.dumps(data)))
+
+    assert record_1.issuer is record_2.issuer
+    assert record_1.subject[0] is record_2.subject[0]
+
+
+def test_cert_record_failed_and_unknown_fields():
+    data = {'Cert Status': 'TIMED_OUT', 'Serial': '00ab', 'Other': [1, 2]}
+
+    record = CertRecord.from_dict(data)
+
+    assert record.serial == '00ab'
+    assert record.to_dict() == data
+    assert record.not_after_date.year == 1
@@ -0,0 +1,100 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from cert_hero import resolver as resolver_mod
+from cert_hero.resolver import Resolver
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Count the calls to `socket.getaddrinfo()`, and fail for any `*.invalid` host."""
+    calls = []
+    _getaddrinfo = socket.getaddrinfo
+
+    def fake_getaddrinfo(host, port, *args, **kwargs):
+        calls.append(host)
+        if host.endswith('.invalid'):
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        if host == 'slow.test':
+            time.sleep(0.1)
+        return _getaddrinfo('127.0.0.1', port, *args, **kwargs)
+
+    monkeypatch.setattr(resolver_mod.socket, 'getaddrinfo', fake_getaddrinfo)
+    return calls
+
+
+def test_resolve_is_cached(lookups):
+    resolver = Resolver()
+
+    addr_infos = resolver.resolve('example.test', 8443)
+    assert addr_infos[0][4] == ('127.0.0.1', 8443)
+    assert resolver.resolve('example.test', 443)[0][4] == ('127.0.0.1', 443)
+
+    assert lookups == ['example.test']
+
+
+def test_resolve_cache_expires(lookups):
+    resolver = Resolver(ttl=0)
+
+    resolver.resolve('example.test')
+    resolver.resolve('example.test')
+
+    assert lookups == ['example.test', 'example.test']
+
+
+def test_resolve_negative_cache(lookups):
+    resolver = Resolver()
+
+    for _ in range(3):
+        with pytest.raises(socket.gaierror):
+            resolver.resolve('missing.invalid')
+
+    assert lookups == ['missing.invalid']
+
+
+def test_resolve_concurrent_lookups_are_shared(lookups):
+    resolver = Resolver()
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(resolver.resolve('slow.test')))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 5
+    assert lookups == ['slow.test']
+
+
+def test_resolve_pre_resolved_addresses(lookups):
+    resolver = Resolver(addresses={'internal.test': ['10.0.0.7', '2001:db8::7']})
+
+    addr_infos = resolver.resolve('internal.test', 636)
+
+    assert [addr_info[4][:2] for addr_info in addr_infos] == [('10.0.0.7', 636), ('2001:db8::7', 636)]
+    assert lookups == []
+
+
+def test_resolve_many(lookups):
+    resolver = Resolver()
+
+    results = resolver.resolve_many(['a.test', 'b.invalid', 'a.test'])
+
+    assert set(results) == {'a.test', 'b.invalid'}
+    assert isinstance(results['b.invalid'], socket.gaierror)
+    assert results['a.test'][0][4] == ('127.0.0.1', 443)
+
+
+def test_async_resolve(lookups):
+    resolver = Resolver()
+
+    async def resolve_all():
+        return await asyncio.gather(*(resolver.async_resolve('slow.test') for _ in range(5)))
+
+    assert len(asyncio.run(resolve_all())) == 5
+    assert lookups == ['slow.test']
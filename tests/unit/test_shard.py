@@ -0,0 +1,67 @@
+from datetime import date
+
+from cert_hero import CertHero, SweepJournal, in_shard, merge_shards, shard_of, sharded_certs_please
+
+
+def test_shard_of():
+    targets = [f'{i}.test' for i in range(100)]
+
+    # the same for a host with or without its default port
+    assert [shard_of(t, 4) for t in targets] == [shard_of(f'{t}:443', 4) for t in targets]
+    assert [shard_of(t, 4) for t in targets] == [shard_of((t, 443), 4) for t in targets]
+    assert set(shard_of(t, 4) for t in targets) == {0, 1, 2, 3}
+
+    shards = [list(in_shard(targets, index, 4)) for index in range(4)]
+    assert sorted(t for shard in shards for t in shard) == sorted(targets)
+
+    # with `ports`, each host:port is assigned to a shard
+    shards = [list(in_shard(targets, index, 4, ports=[443, 8443])) for index in range(4)]
+    assert all(shard_of(t, 4) == index for index, shard in enumerate(shards) for t in shard)
+    assert sorted(t for shard in shards for t in shard) == sorted((t, p) for t in targets for p in (443, 8443))
+
+
+def test_sharded_certs_please(tmp_path, tls_server, closed_port):
+    targets = [f'127.0.0.1:{tls_server.port}', f'localhost:{tls_server.port}', f'127.0.0.1:{closed_port}']
+
+    paths = sharded_certs_please(targets, processes=2, directory=tmp_path, cert_only=True, timeout=1)
+    assert paths == [tmp_path / 'shard-0-0.jsonl', tmp_path / 'shard-0-1.jsonl']
+
+    host_to_cert = dict(merge_shards([tmp_path]))
+    assert host_to_cert.keys() == set(targets)
+    assert host_to_cert[targets[0]]['Cert Status'] == 'SUCCESS'
+    assert host_to_cert[targets[2]]['Cert Status'] == 'CONNECTION_REFUSED'
+    assert host_to_cert[targets[2]].not_after_date == date.min
+
+
+def test_sharded_certs_please_decode_processes(tmp_path, tls_server):
+    target = f'127.0.0.1:{tls_server.port}'
+
+    paths = sharded_certs_please([target], processes=1, directory=tmp_path, decode_processes=1, cert_only=True)
+
+    assert dict(merge_shards(paths))[target]['Cert Status'] == 'SUCCESS'
+
+
+def test_sharded_certs_please_across_machines(tmp_path, closed_port):
+    targets = [f'127.0.0.{i}:{closed_port}' for i in range(1, 9)]
+
+    for index in range(2):
+        sharded_certs_please(targets, processes=1, directory=tmp_path / str(index), shard=(index, 2), timeout=1)
+
+    shard_0 = dict(merge_shards([tmp_path / '0']))
+    shard_1 = dict(merge_shards([tmp_path / '1']))
+    assert shard_0.keys().isdisjoint(shard_1.keys())
+    assert shard_0.keys() | shard_1.keys() == set(targets)
+    assert set(shard_0) == set(in_shard(targets, 0, 2))
+
+
+def test_merge_shards_is_read_only(tmp_path):
+    path = tmp_path / 'shard-0-0.jsonl'
+    with SweepJournal(path) as journal:
+        journal.record('ok.test', CertHero({'Cert Status': 'SUCCESS'}))
+    # a worker which died in the middle of writing a line
+    with path.open('ab') as f:
+        f.write(b'{"target": "partial.test:443", "ce')
+    data = path.read_bytes()
+
+    assert [target for target, _ in merge_shards([tmp_path])] == ['ok.test:443']
+    assert path.read_bytes() == data
@@ -0,0 +1,55 @@
+"""Tests for `cert_hero.stats` module."""
+import asyncio
+
+import pytest
+
+from cert_hero import SweepStats, aio, cert_hero
+from cert_hero.stats import PHASES
+
+
+def test_sweep_stats_summary():
+    stats = SweepStats()
+
+    for seconds in (0.1, 0.2, 0.3, 0.4, 0.5):
+        cert = cert_hero.CertHero({'Cert Status': 'SUCCESS'})
+        cert._timings = {'connect': seconds, 'total': 2 * seconds}
+        cert._tls_version = 'TLSv1.3'
+        stats.add(cert)
+    stats.add(cert_hero._build_failed_cert('TIMED_OUT'))
+
+    assert stats.statuses == {'SUCCESS': 5, 'TIMED_OUT': 1}
+    assert stats.tls_versions == {'TLSv1.3': 5}
+    assert stats.percentile('connect', 50) == pytest.approx(0.3)
+    assert stats.percentile('connect', 90) == pytest.approx(0.46)
+    assert stats.percentile('dns', 50) is None
+
+    summary = stats.summary()
+    assert list(summary) == ['connect', 'total']
+    assert summary['total'] == {
+        'count': 5, 'mean': pytest.approx(0.6), 'p50': pytest.approx(0.6),
+        'p90': pytest.approx(0.92), 'p99': pytest.approx(0.992), 'max': pytest.approx(1.0),
+    }
+
+
+def test_cert_please_timings(tls_server):
+    cert = cert_hero.cert_please(('127.0.0.1', tls_server.port), timings=True)
+
+    assert list(cert.timings) == list(PHASES)
+    assert cert.timings['total'] >= cert.timings['handshake'] > 0
+    assert cert.tls_version.startswith('TLS')
+    assert cert.cipher
+
+    assert cert_hero.cert_please(('127.0.0.1', tls_server.port)).timings is None
+
+
+def test_certs_please_stats(tls_server):
+    stats = SweepStats()
+
+    # `timings` can be passed in as well, even though `stats` turns it on
+    cert_hero.certs_please([f'127.0.0.1:{tls_server.port}'] * 2, cert_only=True, stats=stats, timings=True)
+    asyncio.run(aio.async_certs_please([f'127.0.0.1:{tls_server.port}'], cert_only=True, stats=stats, timings=False))
+
+    assert stats.statuses == {'SUCCESS': 3}
+    summary = stats.summary()
+    assert 'http' not in summary
+    assert summary['handshake']['count'] == 3